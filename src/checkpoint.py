@@ -0,0 +1,58 @@
+"""
+This module persists run checkpoints, so an interrupted run can be resumed with
+`python -m src.main --resume` without redoing its completed steps.
+
+A checkpoint is written after every successful step and holds the loop counter, the
+planner state and the controller state (browser URL and storage state, connected app).
+The storage state includes the session's cookies, so the file is only readable by its owner.
+"""
+
+import datetime
+import json
+import os
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSETS_DIR = os.path.join(PROJECT_ROOT, 'assets')
+CHECKPOINT_FILE = os.path.join(ASSETS_DIR, "CHECKPOINT.json")
+
+def save_checkpoint(checkpoint: dict) -> None:
+    """
+    Atomically replaces the checkpoint file, so a crash while saving leaves the previous one intact.
+    """
+    checkpoint = dict(checkpoint, saved_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+    try:
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        tmp_path = CHECKPOINT_FILE + ".tmp"
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), 0o600) # Also for a leftover temporary file
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CHECKPOINT_FILE)
+    except IOError as e:
+        print(f"Error writing checkpoint: {e}")
+
+def load_checkpoint() -> dict | None:
+    """
+    Returns the last checkpoint, or None if there is none or it cannot be read.
+    """
+    if not os.path.exists(CHECKPOINT_FILE):
+        return None
+    try:
+        with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError) as e:
+        print(f"Error reading checkpoint: {e}")
+        return None
+
+def clear_checkpoint() -> None:
+    """
+    Removes the checkpoint once the run it belongs to has finished.
+    """
+    try:
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
+    except IOError as e:
+        print(f"Error removing checkpoint: {e}")
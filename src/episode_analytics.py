@@ -0,0 +1,251 @@
+"""
+This module aggregates the structured episode records in EPISODES.jsonl (written by
+memory_summarizer) into success rates, latency percentiles, daily trends and a
+regression report comparing the most recent episodes against the ones before them.
+
+Episodes are streamed line by line and step latencies are kept in compact per-action
+arrays, so hundreds of thousands of episodes are processed in a few seconds.
+
+Usage:
+    python -m src.episode_analytics [--file PATH] [--window N] [--threshold RATIO] [--json]
+"""
+
+import argparse
+import array
+import collections
+import json
+import os
+import time
+
+EPISODES_FILE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'EPISODES.jsonl')
+
+DEFAULT_WINDOW = 1000 # Most recent episodes compared against the baseline
+DEFAULT_REGRESSION_THRESHOLD = 0.2 # Relative latency increase flagged as a regression
+PERCENTILES = (50, 90, 95, 99)
+
+class LatencySeries:
+    """
+    Columnar store of latencies with the index of the episode each one belongs to.
+    """
+    __slots__ = ("durations", "episodes")
+
+    def __init__(self):
+        self.durations = array.array('d')
+        self.episodes = array.array('q')
+
+    def add(self, duration_ms: float, episode_index: int) -> None:
+        self.durations.append(duration_ms)
+        self.episodes.append(episode_index)
+
+    def split(self, cutoff: int) -> tuple[list[float], list[float]]:
+        """
+        Splits the latencies into those of episodes before cutoff and from cutoff on.
+        """
+        baseline, recent = [], []
+        for duration, episode in zip(self.durations, self.episodes):
+            (recent if episode >= cutoff else baseline).append(duration)
+        return baseline, recent
+
+class EpisodeStats:
+    """
+    Streaming aggregate over episode records.
+    """
+
+    def __init__(self):
+        self.episodes = 0
+        self.malformed = 0
+        self.goal_counts = collections.Counter()
+        self.goal_successes = collections.Counter()
+        self.action_counts = collections.Counter()
+        self.action_successes = collections.Counter()
+        self.action_latency = collections.defaultdict(LatencySeries)
+        self.episode_latency = LatencySeries()
+        self.daily_counts = collections.Counter()
+        self.daily_successes = collections.Counter()
+        self.daily_latency = collections.defaultdict(lambda: array.array('d'))
+
+    def add(self, episode: dict) -> None:
+        """
+        Folds one episode record into the aggregate.
+        """
+        index = self.episodes
+        self.episodes += 1
+        succeeded = episode.get("outcome") == "Success"
+        goal = episode.get("goal", "Unknown Goal")
+        self.goal_counts[goal] += 1
+        self.goal_successes[goal] += succeeded
+
+        day = (episode.get("ended_at") or "unknown")[:10]
+        self.daily_counts[day] += 1
+        self.daily_successes[day] += succeeded
+
+        total_ms = episode.get("total_duration_ms")
+        if total_ms is not None:
+            self.episode_latency.add(total_ms, index)
+            self.daily_latency[day].append(total_ms)
+
+        for step in episode.get("steps", ()):
+            action = step.get("action") or step.get("action_type") or "unknown"
+            self.action_counts[action] += 1
+            self.action_successes[action] += step.get("status") == "Success"
+            duration = step.get("duration_ms")
+            if duration is not None:
+                self.action_latency[action].add(duration, index)
+
+def iter_episodes(path: str):
+    """
+    Yields the episode records of a JSON lines file one at a time.
+    Malformed lines are yielded as None so callers can count them.
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+def aggregate(path: str = EPISODES_FILE) -> EpisodeStats:
+    """
+    Streams an episodes file into an EpisodeStats aggregate.
+    """
+    stats = EpisodeStats()
+    for episode in iter_episodes(path):
+        if episode is None:
+            stats.malformed += 1
+        else:
+            stats.add(episode)
+    return stats
+
+def percentiles(values) -> dict:
+    """
+    Returns the nearest-rank PERCENTILES of the values, or an empty dict if there are none.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {}
+    for p in PERCENTILES:
+        rank = max(1, -(-p * len(ordered) // 100)) # ceil(p/100 * n)
+        result[f"p{p}"] = ordered[rank - 1]
+    return result
+
+def build_report(stats: EpisodeStats, window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> dict:
+    """
+    Turns an aggregate into a report of success rates, latency percentiles, daily trends
+    and latency regressions of the last `window` episodes against all earlier ones.
+    """
+    cutoff = max(0, stats.episodes - window)
+
+    goals = {
+        goal: {"episodes": count, "success_rate": stats.goal_successes[goal] / count}
+        for goal, count in stats.goal_counts.most_common()
+    }
+
+    actions = {}
+    regressions = []
+    for action, count in stats.action_counts.most_common():
+        series = stats.action_latency.get(action)
+        actions[action] = {
+            "steps": count,
+            "success_rate": stats.action_successes[action] / count,
+            "latency_ms": percentiles(series.durations) if series else {},
+        }
+        if series is None or cutoff == 0:
+            continue
+        baseline, recent = series.split(cutoff)
+        baseline_p, recent_p = percentiles(baseline), percentiles(recent)
+        if not baseline_p or not recent_p:
+            continue
+        for key in ("p50", "p95"):
+            if baseline_p[key] > 0 and recent_p[key] > baseline_p[key] * (1 + threshold):
+                regressions.append({
+                    "action": action,
+                    "percentile": key,
+                    "baseline_ms": baseline_p[key],
+                    "recent_ms": recent_p[key],
+                    "change": recent_p[key] / baseline_p[key] - 1,
+                })
+
+    trend = [
+        {
+            "day": day,
+            "episodes": stats.daily_counts[day],
+            "success_rate": stats.daily_successes[day] / stats.daily_counts[day],
+            "latency_ms": percentiles(stats.daily_latency.get(day, ())),
+        }
+        for day in sorted(stats.daily_counts)
+    ]
+
+    return {
+        "episodes": stats.episodes,
+        "malformed_lines": stats.malformed,
+        "success_rate": sum(stats.goal_successes.values()) / stats.episodes if stats.episodes else 0.0,
+        "episode_latency_ms": percentiles(stats.episode_latency.durations),
+        "goals": goals,
+        "actions": actions,
+        "trend": trend,
+        "regression_window": window,
+        "regressions": regressions,
+    }
+
+def _format_percentiles(values: dict) -> str:
+    return " ".join(f"{key}={value:.1f}" for key, value in values.items()) or "n/a"
+
+def format_report(report: dict) -> str:
+    """
+    Renders a report as plain text.
+    """
+    lines = [
+        f"Episodes: {report['episodes']} (malformed lines: {report['malformed_lines']})",
+        f"Overall success rate: {report['success_rate']:.1%}",
+        f"Episode latency (ms): {_format_percentiles(report['episode_latency_ms'])}",
+        "",
+        "Success rate by action (worst first):",
+    ]
+    for action, data in sorted(report["actions"].items(), key=lambda item: item[1]["success_rate"]):
+        lines.append(f"  {action:<24} {data['success_rate']:>7.1%} of {data['steps']:<8} latency (ms): {_format_percentiles(data['latency_ms'])}")
+
+    lines += ["", "Success rate by goal:"]
+    for goal, data in report["goals"].items():
+        lines.append(f"  {data['success_rate']:>7.1%} of {data['episodes']:<8} {goal}")
+
+    lines += ["", "Daily trend:"]
+    for row in report["trend"]:
+        lines.append(f"  {row['day']}  {row['episodes']:>8} episodes  {row['success_rate']:>7.1%}  latency (ms): {_format_percentiles(row['latency_ms'])}")
+
+    lines += ["", f"Regressions (last {report['regression_window']} episodes vs. earlier):"]
+    if not report["regressions"]:
+        lines.append("  none")
+    for regression in report["regressions"]:
+        lines.append(
+            f"  {regression['action']} {regression['percentile']}: "
+            f"{regression['baseline_ms']:.1f} -> {regression['recent_ms']:.1f} ms ({regression['change']:+.0%})"
+        )
+    return "\n".join(lines)
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate G.E.A.R. episode records.")
+    parser.add_argument("--file", default=EPISODES_FILE, help="Episode records (JSON lines) to analyse.")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Number of most recent episodes checked for regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="Relative latency increase reported as a regression.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"INFO: No episode records found at {args.file}.")
+        return
+
+    started = time.perf_counter()
+    report = build_report(aggregate(args.file), window=args.window, threshold=args.threshold)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+        print(f"\nINFO: Analysed {report['episodes']} episodes in {elapsed:.2f} s.")
+
+if __name__ == "__main__":
+    main()
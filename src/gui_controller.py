@@ -5,7 +5,24 @@ import psutil
 import subprocess
 import pyautogui
 import re
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext # Import Playwright components
+from playwright.sync_api import Page, Browser, BrowserContext # Import Playwright components
+from playwright.async_api import async_playwright
+import asyncio
+import concurrent.futures
+import functools
+
+try:
+    import comtypes # pywinauto's uia backend talks to UI Automation through comtypes
+except ImportError:
+    comtypes = None
+
+def _init_gui_thread() -> None:
+    """
+    Initializes COM in the GUI thread, with the apartment model pywinauto set up for the
+    thread that imported it (sys.coinit_flags).
+    """
+    if comtypes is not None:
+        comtypes.CoInitializeEx()
 
 class GUIController:
     """
@@ -20,6 +37,28 @@ class GUIController:
         """
         self.backend = backend
         self.current_app = None # To hold the currently connected pywinauto application object
+        self._executor = None # The GUI thread, started on first use by run_async
+
+    async def run_async(self, action, *args):
+        """
+        Runs a blocking GUI method without blocking the event loop.
+        COM is initialized per thread, so every call runs on the same dedicated GUI thread,
+        and a call waits for any earlier one that is still running (e.g. after a step
+        timeout) instead of overlapping it.
+        :param action: The method (or other callable) to run.
+        :return: The return value of the action.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui", initializer=_init_gui_thread)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(action, *args))
+
+    def shutdown(self) -> None:
+        """
+        Stops the GUI thread once the running call (if any) has finished.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def _get_process_id_by_name(self, app_exe_name: str, timeout: int = 10) -> int | None:
         """
@@ -134,6 +173,36 @@ class GUIController:
             print(f"ERROR: An unexpected error occurred while starting application (AUMID: {aumid}, Path: {path}): {e}")
             return False
 
+    def export_state(self) -> dict | None:
+        """
+        Describes the connected application so a resumed run can reconnect to it.
+        :return: The backend and process ID of the connected application, or None if none is connected.
+        """
+        if not self.current_app:
+            return None
+        try:
+            return {"backend": self.backend, "process": self.current_app.process}
+        except Exception as e:
+            print(f"ERROR: Error exporting application state: {e}")
+            return None
+
+    def restore_state(self, state: dict, timeout: int = 5) -> bool:
+        """
+        Reconnects to the application described by export_state, if it is still running.
+        :param state: The state returned by export_state.
+        :param timeout: How long to wait for the connection (in seconds).
+        :return: True if reconnected, False otherwise.
+        """
+        try:
+            app = Application(backend=state.get("backend", self.backend))
+            app.connect(process=state["process"], timeout=timeout)
+            self.current_app = app
+            print(f"DEBUG: Reconnected to application with PID: {state['process']}")
+            return True
+        except Exception as e:
+            print(f"ERROR: Could not reconnect to application with PID {state.get('process')}: {e}")
+            return False
+
     def close_current_application(self) -> bool:
         """
         Closes the currently connected application.
@@ -346,43 +415,88 @@ class GUIController:
         print(f"ERROR: Image '{image_path}' not found within {timeout} seconds.")
         return False
 
-class WebController:
+class AsyncWebController:
     """
-    Manages web automation tasks using Playwright.
+    Manages web automation tasks using Playwright's async API.
+    Every action is a coroutine, so it can be awaited from the asyncio agent loop
+    without blocking it. WebController is the synchronous interface on top of it.
     """
     def __init__(self):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.browser_type = None
+        self.headless = None
 
-    def launch_browser(self, browser_type: str = "chromium", headless: bool = True) -> bool:
+    async def launch_browser(self, browser_type: str = "chromium", headless: bool = True, storage_state: dict | None = None) -> bool:
         """
         Launches a browser instance.
         :param browser_type: Type of browser to launch ('chromium', 'firefox', 'webkit').
         :param headless: Whether to run the browser in headless mode.
+        :param storage_state: Cookies and local storage to start the context with (see export_state).
         :return: True if successful, False otherwise.
         """
         try:
-            self.playwright = sync_playwright().start()
+            self.playwright = await async_playwright().start()
             if browser_type == "chromium":
-                self.browser = self.playwright.chromium.launch(headless=headless)
+                self.browser = await self.playwright.chromium.launch(headless=headless)
             elif browser_type == "firefox":
-                self.browser = self.playwright.firefox.launch(headless=headless)
+                self.browser = await self.playwright.firefox.launch(headless=headless)
             elif browser_type == "webkit":
-                self.browser = self.playwright.webkit.launch(headless=headless)
+                self.browser = await self.playwright.webkit.launch(headless=headless)
             else:
                 print(f"ERROR: Unsupported browser type: {browser_type}")
                 return False
-            self.context = self.browser.new_context()
-            self.page = self.context.new_page()
+            self.context = await self.browser.new_context(storage_state=storage_state)
+            self.page = await self.context.new_page()
+            self.browser_type = browser_type
+            self.headless = headless
             print(f"DEBUG: Launched {browser_type} browser (headless={headless}).")
             return True
         except Exception as e:
             print(f"ERROR: Error launching browser: {e}")
             return False
 
-    def navigate(self, url: str) -> bool:
+    async def export_state(self) -> dict | None:
+        """
+        Captures what is needed to restore the browser session in a resumed run.
+        :return: The browser type, headless flag, current URL and storage state (cookies and
+                 local storage) of the context, or None if no browser is running.
+        """
+        if not self.page:
+            return None
+        try:
+            return {
+                "browser_type": self.browser_type,
+                "headless": self.headless,
+                "url": self.page.url,
+                "storage_state": await self.context.storage_state(),
+            }
+        except Exception as e:
+            print(f"ERROR: Error exporting browser state: {e}")
+            return None
+
+    async def restore_state(self, state: dict) -> bool:
+        """
+        Relaunches the browser with the storage state captured by export_state and
+        navigates back to the captured URL.
+        :param state: The state returned by export_state.
+        :return: True if successful, False otherwise.
+        """
+        launched = await self.launch_browser(
+            browser_type=state.get("browser_type") or "chromium",
+            headless=state.get("headless", True),
+            storage_state=state.get("storage_state")
+        )
+        if not launched:
+            return False
+        url = state.get("url")
+        if url and url != "about:blank":
+            return await self.navigate(url)
+        return True
+
+    async def navigate(self, url: str) -> bool:
         """
         Navigates to a specified URL.
         :param url: The URL to navigate to.
@@ -392,14 +506,14 @@ class WebController:
             print("ERROR: No page available. Launch browser first.")
             return False
         try:
-            self.page.goto(url)
+            await self.page.goto(url)
             print(f"DEBUG: Navigated to URL: {url}")
             return True
         except Exception as e:
             print(f"ERROR: Error navigating to URL {url}: {e}")
             return False
 
-    def type_text_web(self, selector: str, text: str) -> bool:
+    async def type_text_web(self, selector: str, text: str) -> bool:
         """
         Types text into an element identified by a CSS selector.
         :param selector: CSS selector of the input element.
@@ -410,14 +524,14 @@ class WebController:
             print("ERROR: No page available. Launch browser first.")
             return False
         try:
-            self.page.fill(selector, text)
+            await self.page.fill(selector, text)
             print(f"DEBUG: Typed text '{text}' into selector '{selector}'.")
             return True
         except Exception as e:
             print(f"ERROR: Error typing text into selector '{selector}': {e}")
             return False
 
-    def click_element_web(self, selector: str) -> bool:
+    async def click_element_web(self, selector: str) -> bool:
         """
         Clicks an element identified by a CSS selector.
         :param selector: CSS selector of the element to click.
@@ -427,14 +541,14 @@ class WebController:
             print("ERROR: No page available. Launch browser first.")
             return False
         try:
-            self.page.click(selector)
+            await self.page.click(selector)
             print(f"DEBUG: Clicked element with selector '{selector}'.")
             return True
         except Exception as e:
             print(f"ERROR: Error clicking element with selector '{selector}': {e}")
             return False
 
-    def get_text_content(self, selector: str) -> str | None:
+    async def get_text_content(self, selector: str) -> str | None:
         """
         Gets the text content of an element identified by a CSS selector.
         :param selector: CSS selector of the element.
@@ -444,14 +558,14 @@ class WebController:
             print("ERROR: No page available. Launch browser first.")
             return None
         try:
-            text_content = self.page.text_content(selector)
+            text_content = await self.page.text_content(selector)
             print(f"DEBUG: Got text content from selector '{selector}'.")
             return text_content
         except Exception as e:
             print(f"ERROR: Error getting text content from selector '{selector}': {e}")
             return None
 
-    def wait_for_selector(self, selector: str, state: str = "visible", timeout: int = 30000) -> bool:
+    async def wait_for_selector(self, selector: str, state: str = "visible", timeout: int = 30000) -> bool:
         """
         Waits for an element identified by a CSS selector to satisfy a certain state.
         :param selector: CSS selector of the element.
@@ -463,27 +577,105 @@ class WebController:
             print("ERROR: No page available. Launch browser first.")
             return False
         try:
-            self.page.wait_for_selector(selector, state=state, timeout=timeout)
+            await self.page.wait_for_selector(selector, state=state, timeout=timeout)
             print(f"DEBUG: Waited for selector '{selector}' to be '{state}'.")
             return True
         except Exception as e:
             print(f"ERROR: Error waiting for selector '{selector}' to be '{state}': {e}")
             return False
 
-    def close_browser(self) -> bool:
+    async def close_browser(self) -> bool:
         """
         Closes the browser instance.
         :return: True if successful, False otherwise.
         """
         try:
             if self.browser:
-                self.browser.close()
-                self.browser = None
+                await self.browser.close()
             if self.playwright:
-                self.playwright.stop()
-                self.playwright = None
+                await self.playwright.stop()
             print("DEBUG: Browser closed.")
             return True
         except Exception as e:
             print(f"ERROR: Error closing browser: {e}")
             return False
+        finally:
+            # The context and page die with the browser; export_state must not touch them.
+            self.playwright = None
+            self.browser = None
+            self.context = None
+            self.page = None
+
+class WebController:
+    """
+    Manages web automation tasks using Playwright, synchronously.
+    Runs an AsyncWebController on a private event loop, so it must not be used from
+    inside a running event loop (use AsyncWebController there).
+    """
+    def __init__(self):
+        self.async_controller = AsyncWebController()
+        self._loop = asyncio.new_event_loop()
+
+    def run(self, coroutine):
+        """
+        Runs a coroutine on this controller's event loop, which its browser session is bound to.
+        """
+        return self._loop.run_until_complete(coroutine)
+
+    @property
+    def playwright(self):
+        return self.async_controller.playwright
+
+    @property
+    def browser(self):
+        return self.async_controller.browser
+
+    @property
+    def context(self):
+        return self.async_controller.context
+
+    @property
+    def page(self):
+        return self.async_controller.page
+
+    def launch_browser(self, browser_type: str = "chromium", headless: bool = True) -> bool:
+        """
+        Launches a browser instance. See AsyncWebController.launch_browser.
+        """
+        return self.run(self.async_controller.launch_browser(browser_type, headless))
+
+    def navigate(self, url: str) -> bool:
+        """
+        Navigates to a specified URL. See AsyncWebController.navigate.
+        """
+        return self.run(self.async_controller.navigate(url))
+
+    def type_text_web(self, selector: str, text: str) -> bool:
+        """
+        Types text into an element identified by a CSS selector. See AsyncWebController.type_text_web.
+        """
+        return self.run(self.async_controller.type_text_web(selector, text))
+
+    def click_element_web(self, selector: str) -> bool:
+        """
+        Clicks an element identified by a CSS selector. See AsyncWebController.click_element_web.
+        """
+        return self.run(self.async_controller.click_element_web(selector))
+
+    def get_text_content(self, selector: str) -> str | None:
+        """
+        Gets the text content of an element identified by a CSS selector. See AsyncWebController.get_text_content.
+        """
+        return self.run(self.async_controller.get_text_content(selector))
+
+    def wait_for_selector(self, selector: str, state: str = "visible", timeout: int = 30000) -> bool:
+        """
+        Waits for an element to satisfy a certain state. See AsyncWebController.wait_for_selector.
+        """
+        return self.run(self.async_controller.wait_for_selector(selector, state=state, timeout=timeout))
+
+    def close_browser(self) -> bool:
+        """
+        Closes the browser instance. See AsyncWebController.close_browser.
+        """
+        return self.run(self.async_controller.close_browser())
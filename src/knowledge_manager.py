@@ -2,40 +2,203 @@
 This module manages the agent's knowledge base (working memory).
 """
 
+import atexit
+import bisect
+import collections.abc
+import contextlib
 import datetime
+import gzip
+import itertools
+import json
+import threading
 import uuid
 import os
 import re
+import sys
+import zlib
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 # --- Path Setup ---
 # Dynamically determine the project root and assets directory
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 ASSETS_DIR = os.path.join(PROJECT_ROOT, 'assets')
 KNOWLEDGE_FILE = os.path.join(ASSETS_DIR, "KNOWLEDGE.md")
+KNOWLEDGE_LOCK_FILE = os.path.join(ASSETS_DIR, "KNOWLEDGE.lock")
+ARCHIVE_DIR = os.path.join(ASSETS_DIR, "knowledge_archive")
+ARCHIVE_MANIFEST_FILE = os.path.join(ARCHIVE_DIR, "manifest.json")
 
-def record_knowledge(
+# Bounds for the active (hot) segment. Once either is reached, the segment is closed,
+# compressed into ARCHIVE_DIR and a fresh KNOWLEDGE.md is started. Flushed batches are
+# split at the bounds, so only a single entry larger than MAX_SEGMENT_BYTES exceeds them.
+MAX_SEGMENT_BYTES = 256 * 1024
+MAX_SEGMENT_ENTRIES = 200
+
+# Every entry starts with this header line sequence, followed by the format line, and
+# ends with a terminator that repeats the entry's id (see _entry_end). Task output can
+# contain any text, but not the terminator of an entry whose id is generated after the
+# output was captured, so an entry is complete exactly when its own terminator is there.
+# Anything after the last complete entry is a torn write and is never parsed.
+ENTRY_START = "---\nid: "
+ENTRY_FORMAT_LINE = "format: 2\n"
+# Terminator of entries written before ENTRY_FORMAT_LINE existed. Task output can contain
+# it, so it is only trusted for entries without the format line.
+LEGACY_ENTRY_END = "\n---\n\n"
+
+# Scopes accepted by the readers:
+# - "active":  only the hot KNOWLEDGE.md segment
+# - "working": archived segments not yet consolidated into episodic memory + the active one
+# - "all":     every archived segment (including consolidated ones) + the active one
+HISTORY_SCOPES = ("active", "working", "all")
+
+# Durability modes of KnowledgeWriter:
+# - "none":   rely on the OS page cache, no fsync
+# - "batch":  fsync once per flushed batch
+# - "record": flush and fsync every entry as soon as it is appended
+DURABILITY_NONE = "none"
+DURABILITY_BATCH = "batch"
+DURABILITY_RECORD = "record"
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_BATCH, DURABILITY_RECORD)
+
+# --- Locking ---
+# The advisory file lock serializes writers across processes; the re-entrant thread
+# lock serializes threads of this process and lets locked helpers call each other.
+# Lock order: a KnowledgeWriter's mutex before _thread_lock (flush takes both), so
+# never flush or close a writer while holding _thread_lock.
+_thread_lock = threading.RLock()
+_lock_depth = 0
+_lock_handle = None
+
+@contextlib.contextmanager
+def knowledge_lock():
+    """
+    Holds the advisory lock on the knowledge base (KNOWLEDGE.lock) for the duration
+    of the block. Re-entrant within a thread.
+    """
+    global _lock_depth, _lock_handle
+    with _thread_lock:
+        if _lock_depth == 0:
+            os.makedirs(ASSETS_DIR, exist_ok=True)
+            _lock_handle = open(KNOWLEDGE_LOCK_FILE, "a+b")
+            if os.name == "nt":
+                _lock_handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(_lock_handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 seconds; keep waiting like flock does.
+                        continue
+            else:
+                fcntl.flock(_lock_handle.fileno(), fcntl.LOCK_EX)
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0:
+                if os.name == "nt":
+                    _lock_handle.seek(0)
+                    msvcrt.locking(_lock_handle.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(_lock_handle.fileno(), fcntl.LOCK_UN)
+                _lock_handle.close()
+                _lock_handle = None
+
+def _entry_end(entry_id: str) -> str:
+    """
+    Returns the terminator of the entry with the given id.
+    """
+    return f"\n---\nend: {entry_id}\n\n"
+
+_ENTRY_START_BYTES = ENTRY_START.encode("utf-8")
+_ENTRY_FORMAT_LINE_BYTES = ENTRY_FORMAT_LINE.encode("utf-8")
+_LEGACY_ENTRY_END_BYTES = LEGACY_ENTRY_END.encode("utf-8")
+
+def _entry_span(data: bytes, start: int) -> tuple[int, str] | None:
+    """
+    Returns the end offset and the id of the entry starting at `start` in a raw segment,
+    or None if the entry is incomplete (torn).
+    """
+    id_start = start + len(_ENTRY_START_BYTES)
+    id_end = data.find(b"\n", id_start)
+    if id_end == -1:
+        return None
+    entry_id = data[id_start:id_end].decode("utf-8", errors="replace")
+    if data.startswith(_ENTRY_FORMAT_LINE_BYTES, id_end + 1):
+        terminator = _entry_end(entry_id).encode("utf-8")
+    else:
+        terminator = _LEGACY_ENTRY_END_BYTES
+    end = data.find(terminator, id_end)
+    return (end + len(terminator), entry_id) if end != -1 else None
+
+def _iter_entries(data: bytes):
+    """
+    Yields (start, end, id) of the complete entries of a raw segment, in order, up to the
+    first torn one. Entry-like text inside an entry's output is skipped, not parsed.
+    """
+    start = data.find(_ENTRY_START_BYTES)
+    while start != -1:
+        span = _entry_span(data, start)
+        if span is None:
+            return
+        end, entry_id = span
+        yield start, end, entry_id
+        start = data.find(_ENTRY_START_BYTES, end)
+
+def _complete_prefix(data: bytes) -> bytes:
+    """
+    Returns the part of a raw segment that ends on a complete entry.
+    """
+    end = 0
+    for _, end, _ in _iter_entries(data):
+        pass
+    return data[:end]
+
+def _repair_torn_tail() -> None:
+    """
+    Truncates a partially written entry (e.g. left by a crash mid-flush) from the end
+    of the active segment, so new entries are never appended onto a torn one.
+    Must be called with the knowledge lock held.
+    """
+    if not os.path.exists(KNOWLEDGE_FILE):
+        return
+    with open(KNOWLEDGE_FILE, "r+b") as f:
+        data = f.read()
+        complete = _complete_prefix(data)
+        if len(complete) != len(data):
+            print(f"WARNING: Discarding {len(data) - len(complete)} bytes of a torn knowledge entry.")
+            f.truncate(len(complete))
+
+# --- Writing ---
+
+def _format_knowledge_entry(
     high_level_goal: str,
     task: str,
     command: str,
     status: str,
     stdout: str,
     stderr: str,
-    learning: str = "N/A"
-) -> None:
+    learning: str = "N/A",
+    duration_ms: float | None = None
+) -> str:
     """
-    Records the outcome of a task into the KNOWLEDGE.md file.
+    Formats the outcome of a task as a single knowledge entry.
     """
-    if not os.path.exists(ASSETS_DIR):
-        os.makedirs(ASSETS_DIR)
-
+    duration = "n/a" if duration_ms is None else f"{duration_ms:.1f}"
+    entry_id = uuid.uuid4()
     # Compact knowledge entry format
-    knowledge_entry = f"""---
-id: {uuid.uuid4()}
-timestamp: {datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    return f"""---
+id: {entry_id}
+{ENTRY_FORMAT_LINE}timestamp: {datetime.datetime.now(datetime.timezone.utc).isoformat()}
 goal: "{high_level_goal}"
 task: `{task}`
 command: `{command}`
 status: `{status}`
+duration_ms: {duration}
 ---
 - **Stdout:**
 ```
@@ -47,47 +210,688 @@ status: `{status}`
 ```
 - **Learning:** {learning}
 ---
+end: {entry_id}
 
 """
-    
+
+class KnowledgeWriter:
+    """
+    Long-lived, buffered writer for the knowledge base.
+
+    Entries are buffered in memory and appended in one write per batch, under the
+    advisory knowledge lock, when the buffer reaches max_entries or max_bytes, when the
+    oldest buffered entry is older than max_delay seconds, on flush() or at close().
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 64 * 1024, max_delay: float = 1.0, durability: str = DURABILITY_BATCH):
+        """
+        :param max_entries: Flush once this many entries are buffered.
+        :param max_bytes: Flush once the buffered entries reach this size (in bytes).
+        :param max_delay: Flush at most this many seconds after an entry was buffered.
+        :param durability: One of DURABILITY_MODES.
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.durability = durability
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._timer = None
+        self._closed = False
+        self._mutex = threading.RLock()
+
+    def append(self, entry: str) -> None:
+        """
+        Buffers a formatted knowledge entry, flushing if a threshold is reached.
+        """
+        with self._mutex:
+            if self._closed:
+                raise ValueError("KnowledgeWriter is closed.")
+            encoded = entry.encode("utf-8")
+            self._buffer.append(encoded)
+            self._buffer_bytes += len(encoded)
+
+            if (self.durability == DURABILITY_RECORD
+                    or len(self._buffer) >= self.max_entries
+                    or self._buffer_bytes >= self.max_bytes):
+                self.flush()
+            elif self._timer is None and self.max_delay > 0:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def record(self, high_level_goal: str, task: str, command: str, status: str, stdout: str, stderr: str, learning: str = "N/A", duration_ms: float | None = None) -> None:
+        """
+        Formats and buffers the outcome of a task.
+        """
+        self.append(_format_knowledge_entry(high_level_goal, task, command, status, stdout, stderr, learning, duration_ms))
+
+    def flush(self) -> bool:
+        """
+        Appends all buffered entries to the active segment under the knowledge lock.
+        :return: True if the buffer is empty afterwards, False if the write failed
+                 (the entries stay buffered and are retried on the next flush).
+        """
+        with self._mutex:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return True
+
+            try:
+                with knowledge_lock():
+                    _repair_torn_tail()
+                    size, entries = _active_segment_stats()
+                    # The batch is split at segment boundaries, so a segment never holds
+                    # more than MAX_SEGMENT_ENTRIES entries, nor more than MAX_SEGMENT_BYTES
+                    # unless a single entry is larger.
+                    chunk = []
+                    for encoded in list(self._buffer):
+                        if entries and (entries >= MAX_SEGMENT_ENTRIES or size + len(encoded) > MAX_SEGMENT_BYTES):
+                            self._append_entries(chunk)
+                            chunk = []
+                            _rotate_knowledge_segment_locked()
+                            size, entries = _active_segment_stats()
+                        chunk.append(encoded)
+                        size += len(encoded)
+                        entries += 1
+                    self._append_entries(chunk)
+                    _rotate_if_needed()
+            except IOError as e:
+                print(f"Error writing to knowledge base: {e}")
+                return False
+            return True
+
+    def _append_entries(self, entries: list[bytes]) -> None:
+        """
+        Appends buffered entries (the oldest ones) to the active segment and drops them
+        from the buffer. Must be called with the mutex and the knowledge lock held.
+        """
+        if not entries:
+            return
+        with open(KNOWLEDGE_FILE, "ab") as f:
+            if self.durability == DURABILITY_RECORD:
+                for encoded in entries:
+                    f.write(encoded)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                f.write(b"".join(entries))
+                f.flush()
+                if self.durability == DURABILITY_BATCH:
+                    os.fsync(f.fileno())
+        del self._buffer[:len(entries)]
+        self._buffer_bytes -= sum(len(encoded) for encoded in entries)
+
+    def close(self) -> None:
+        """
+        Flushes any buffered entries and stops accepting new ones.
+        """
+        with self._mutex:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+_default_writer = None
+
+def get_knowledge_writer() -> KnowledgeWriter:
+    """
+    Returns the process-wide KnowledgeWriter used by record_knowledge, creating it on first use.
+    """
+    global _default_writer
+    with _thread_lock:
+        if _default_writer is None or _default_writer._closed:
+            _default_writer = KnowledgeWriter()
+        return _default_writer
+
+def configure_knowledge_writer(**options) -> KnowledgeWriter:
+    """
+    Replaces the process-wide KnowledgeWriter with one built from the given KnowledgeWriter
+    options (e.g. durability), flushing and closing the current one first.
+    """
+    global _default_writer
+    writer = KnowledgeWriter(**options)
+    with _thread_lock:
+        previous, _default_writer = _default_writer, writer
+    if previous is not None:
+        previous.close()
+    return writer
+
+def flush_knowledge_writer() -> None:
+    """
+    Flushes the process-wide KnowledgeWriter, if one exists.
+    """
+    if _default_writer is not None:
+        _default_writer.flush()
+
+def close_knowledge_writer() -> None:
+    """
+    Flushes and closes the process-wide KnowledgeWriter, if one exists.
+    """
+    if _default_writer is not None:
+        _default_writer.close()
+
+atexit.register(close_knowledge_writer)
+
+def record_knowledge(
+    high_level_goal: str,
+    task: str,
+    command: str,
+    status: str,
+    stdout: str,
+    stderr: str,
+    learning: str = "N/A",
+    duration_ms: float | None = None
+) -> None:
+    """
+    Records the outcome of a task into the KNOWLEDGE.md file through the process-wide
+    KnowledgeWriter. Readers in this module flush it first, so a recorded entry is
+    always visible to the next read.
+    :param duration_ms: Wall-clock time the task took to execute, if measured.
+    """
+    get_knowledge_writer().record(high_level_goal, task, command, status, stdout, stderr, learning, duration_ms)
+
+def set_assets_dir(path: str) -> None:
+    """
+    Points the knowledge base at another assets directory, e.g. a scratch directory
+    for simulations. Buffered entries are flushed to the previous location first.
+    """
+    global ASSETS_DIR, KNOWLEDGE_FILE, KNOWLEDGE_LOCK_FILE, ARCHIVE_DIR, ARCHIVE_MANIFEST_FILE
+    writer = _default_writer
+    # The writer's mutex is held across the switch, so no entry is flushed in between.
+    with (writer._mutex if writer is not None else contextlib.nullcontext()), _thread_lock:
+        if writer is not None:
+            writer.flush()
+        ASSETS_DIR = path
+        KNOWLEDGE_FILE = os.path.join(ASSETS_DIR, "KNOWLEDGE.md")
+        KNOWLEDGE_LOCK_FILE = os.path.join(ASSETS_DIR, "KNOWLEDGE.lock")
+        ARCHIVE_DIR = os.path.join(ASSETS_DIR, "knowledge_archive")
+        ARCHIVE_MANIFEST_FILE = os.path.join(ARCHIVE_DIR, "manifest.json")
+
+# --- Segments ---
+
+def _active_segment_stats() -> tuple[int, int]:
+    """
+    Returns the size in bytes and the number of entries of the active segment.
+    """
+    if not os.path.exists(KNOWLEDGE_FILE):
+        return 0, 0
+    with open(KNOWLEDGE_FILE, "rb") as f:
+        data = f.read()
+    return len(data), sum(1 for _ in _iter_entries(data))
+
+def _rotate_if_needed() -> None:
+    """
+    Closes the active segment if it has grown past MAX_SEGMENT_BYTES or MAX_SEGMENT_ENTRIES.
+    """
     try:
-        with open(KNOWLEDGE_FILE, "a", encoding="utf-8") as f:
-            f.write(knowledge_entry)
+        size, entries = _active_segment_stats()
     except IOError as e:
-        print(f"Error writing to knowledge base: {e}")
+        print(f"Error inspecting knowledge base: {e}")
+        return
+    if size >= MAX_SEGMENT_BYTES or entries >= MAX_SEGMENT_ENTRIES:
+        _rotate_knowledge_segment_locked()
 
-def read_knowledge_history() -> list[dict]:
+def _load_manifest() -> dict:
+    """
+    Loads the archive manifest, returning an empty one if it does not exist yet.
     """
-    Reads and parses the KNOWLEDGE.md file into a list of structured history entries.
+    if not os.path.exists(ARCHIVE_MANIFEST_FILE):
+        return {"next_sequence": 1, "segments": []}
+    with open(ARCHIVE_MANIFEST_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_manifest(manifest: dict) -> None:
+    """
+    Atomically replaces the archive manifest.
+    """
+    tmp_path = ARCHIVE_MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, ARCHIVE_MANIFEST_FILE)
+
+def rotate_knowledge_segment() -> str | None:
+    """
+    Closes the active KNOWLEDGE.md segment: compresses it into the archive directory,
+    registers it in the manifest and starts a fresh, empty active segment.
+
+    The archive file and manifest are written before the active file is truncated, so a
+    crash mid-rotation can at worst duplicate a segment, never lose one.
+
+    Returns:
+        The path of the archived segment, or None if the active segment was empty.
+    """
+    flush_knowledge_writer()
+    with knowledge_lock():
+        return _rotate_knowledge_segment_locked()
+
+def _rotate_knowledge_segment_locked() -> str | None:
+    """
+    Implementation of rotate_knowledge_segment. Must be called with the knowledge lock held.
     """
-    history = []
     if not os.path.exists(KNOWLEDGE_FILE):
-        return history
+        return None
+    try:
+        with open(KNOWLEDGE_FILE, "rb") as f:
+            raw = _complete_prefix(f.read())
+    except IOError as e:
+        print(f"Error reading knowledge base for rotation: {e}")
+        return None
+    if not raw.strip():
+        return None
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    try:
+        manifest = _load_manifest()
+        sequence = manifest["next_sequence"]
+        file_name = f"KNOWLEDGE.{sequence:06d}.md.gz"
+        archive_path = os.path.join(ARCHIVE_DIR, file_name)
+
+        tmp_path = archive_path + ".tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, archive_path)
+
+        records = _index_segment(archive_path, raw)
+        manifest["segments"].append({
+            "sequence": sequence,
+            "file": file_name,
+            "compression": "gzip",
+            "entries": len(records),
+            "raw_bytes": len(raw),
+            "compressed_bytes": os.path.getsize(archive_path),
+            "first_timestamp": records[0].timestamp if records else None,
+            "last_timestamp": records[-1].timestamp if records else None,
+            "archived_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "consolidated": False,
+        })
+        manifest["next_sequence"] = sequence + 1
+        _save_manifest(manifest)
+
+        with open(KNOWLEDGE_FILE, "w", encoding="utf-8") as f:
+            f.write("")
+    except (IOError, ValueError) as e:
+        print(f"Error archiving knowledge segment: {e}")
+        return None
+
+    print(f"INFO: Archived knowledge segment {file_name} ({len(raw)} bytes).")
+    return archive_path
+
+def discard_working_memory() -> None:
+    """
+    Empties the active segment without archiving it. Only meant for scratch knowledge
+    bases (see set_assets_dir); real runs are consolidated by memory_summarizer instead.
+    """
+    flush_knowledge_writer()
+    with knowledge_lock():
+        with open(KNOWLEDGE_FILE, "w", encoding="utf-8") as f:
+            f.write("")
+
+def list_knowledge_segments(include_consolidated: bool = False) -> list[dict]:
+    """
+    Lists archived segments in order, as recorded in the manifest.
+    :param include_consolidated: Also list segments already summarized into episodic memory.
+    """
+    try:
+        segments = _load_manifest()["segments"]
+    except (IOError, ValueError) as e:
+        print(f"Error reading knowledge archive manifest: {e}")
+        return []
+    if include_consolidated:
+        return list(segments)
+    return [segment for segment in segments if not segment.get("consolidated")]
+
+def mark_segments_consolidated() -> int:
+    """
+    Marks every archived segment as consolidated into episodic memory, which removes
+    it from the "working" scope while keeping it on disk for audits.
+    :return: The number of segments newly marked.
+    """
+    with knowledge_lock():
+        try:
+            manifest = _load_manifest()
+        except (IOError, ValueError) as e:
+            print(f"Error reading knowledge archive manifest: {e}")
+            return 0
+        marked = 0
+        for segment in manifest["segments"]:
+            if not segment.get("consolidated"):
+                segment["consolidated"] = True
+                marked += 1
+        if marked:
+            _save_manifest(manifest)
+    return marked
+
+# --- Reading ---
+
+def _read_segments(scope: str) -> list[tuple[str, bytes]]:
+    """
+    Returns (path, raw bytes) of every segment in the scope, oldest first.
+    A torn entry at the end of the active segment is left out.
+    """
+    if scope not in HISTORY_SCOPES:
+        raise ValueError(f"Unknown knowledge scope: {scope}")
+
+    flush_knowledge_writer()
+    segments = []
+    with knowledge_lock():
+        if scope != "active":
+            for segment in list_knowledge_segments(include_consolidated=(scope == "all")):
+                archived = _read_archived_segment(segment)
+                if archived is not None:
+                    segments.append(archived)
+        active = _read_active_segment()
+        if active is not None:
+            segments.append((KNOWLEDGE_FILE, active))
+    return segments
 
+def _read_archived_segment(segment: dict) -> tuple[str, bytes] | None:
+    """
+    Returns the path and decompressed content of an archived segment, or None if it cannot
+    be read (missing, truncated or corrupt), in which case the segment is skipped.
+    """
+    path = os.path.join(ARCHIVE_DIR, segment["file"])
+    try:
+        with gzip.open(path, "rb") as f:
+            return path, f.read()
+    except (IOError, EOFError, gzip.BadGzipFile, zlib.error) as e:
+        print(f"WARNING: Skipping unreadable archived knowledge segment {segment['file']}: {e}")
+        return None
+
+def _read_active_segment() -> bytes | None:
+    """
+    Returns the complete entries of the active segment, or None if there is none.
+    Must be called with the knowledge lock held.
+    """
+    if not os.path.exists(KNOWLEDGE_FILE):
+        return None
     try:
-        with open(KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
+        with open(KNOWLEDGE_FILE, "rb") as f:
+            return _complete_prefix(f.read())
     except IOError as e:
         print(f"Error reading knowledge base: {e}")
-        return history
+        return None
+
+def read_knowledge_text(scope: str = "working") -> str:
+    """
+    Returns the raw knowledge log for the given scope, oldest segment first.
+    A torn entry at the end of the active segment is left out.
+    :param scope: One of HISTORY_SCOPES.
+    """
+    return "".join(data.decode("utf-8") for _, data in _read_segments(scope))
+
+_HEADER_END = b"\n---\n"
+
+# Indexes of archived segments, keyed by (archive directory, manifest sequence, archival time).
+# Archived segments are immutable, so an index stays valid as long as the segment is listed.
+_archived_index_cache = {}
+_BODY_PATTERN = re.compile(
+    r"- \*\*Stdout:\*\*\n```\n(.*?)\n```\n- \*\*Stderr:\*\*\n```\n(.*?)\n```\n- \*\*Learning:\*\* (.*)\n---\n(?:end: [^\n]*\n)?\n\Z",
+    re.DOTALL
+)
+
+class HistoryRecord:
+    """
+    Compact record of one knowledge entry.
+
+    Only the header fields are held in memory; status and task type are interned so
+    equal values share one string. The stdout/stderr/learning body is loaded lazily
+    from the segment file on first access.
+    """
+    __slots__ = ("id", "timestamp", "goal", "task", "command", "status", "task_type", "duration_ms", "_source", "_offset", "_body")
 
-    entries = content.strip().split('---\n')
-    
-    for entry_text in entries:
-        if not entry_text.strip():
+    _HEADER_FIELDS = ("id", "timestamp", "goal", "task", "command", "status", "task_type", "duration_ms")
+    _BODY_FIELDS = ("stdout", "stderr", "learning")
+
+    def __init__(self, id: str, timestamp: str, goal: str, task: str, command: str, status: str, duration_ms: float | None, source: str, offset: int):
+        self.id = id
+        self.timestamp = timestamp
+        self.goal = goal
+        self.task = task
+        self.command = command
+        self.status = sys.intern(status)
+        self.task_type = sys.intern(task.split(':', 1)[0].strip())
+        self.duration_ms = duration_ms
+        self._source = source
+        self._offset = offset
+        self._body = None
+
+    @property
+    def body(self) -> dict:
+        """
+        The entry's stdout, stderr and learning, read from its segment on first access.
+        """
+        if self._body is None:
+            self._body = _load_entry_body(self)
+        return self._body
+
+    def get(self, key: str, default=None):
+        """
+        Dict-style access to header and body fields, for callers of the former list[dict] history.
+        """
+        if key in self._HEADER_FIELDS:
+            return getattr(self, key)
+        if key in self._BODY_FIELDS:
+            return self.body.get(key, default)
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in self._HEADER_FIELDS and key not in self._BODY_FIELDS:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __repr__(self) -> str:
+        return f"HistoryRecord(id={self.id!r}, task={self.task!r}, status={self.status!r})"
+
+def _parse_entry_body(entry: bytes) -> dict | None:
+    """
+    Parses the body of a complete raw entry, from ENTRY_START to its terminator.
+    """
+    header_end = entry.find(_HEADER_END)
+    match = _BODY_PATTERN.match(entry.decode("utf-8", errors="replace"), header_end + len(_HEADER_END)) if header_end != -1 else None
+    if match is None:
+        return None
+    stdout, stderr, learning = match.groups()
+    return {"stdout": stdout, "stderr": stderr, "learning": learning}
+
+def _is_knowledge_base_path(path: str) -> bool:
+    """
+    Whether a file is a segment of the current knowledge base.
+    """
+    path = os.path.abspath(path)
+    return path == os.path.abspath(KNOWLEDGE_FILE) or os.path.dirname(path) == os.path.abspath(ARCHIVE_DIR)
+
+def _load_entry_body(record: HistoryRecord) -> dict:
+    """
+    Reads a record's body from its segment. If the active segment has been rotated since
+    the record was indexed, the entry is looked up by id across all segments instead.
+    Records of logs outside the knowledge base (see read_knowledge_log) are only ever
+    read from their own file.
+    """
+    marker = f"{ENTRY_START}{record.id}\n".encode("utf-8")
+    try:
+        opener = gzip.open if record._source.endswith(".gz") else open
+        with opener(record._source, "rb") as f:
+            f.seek(record._offset)
+            data = f.read(len(marker))
+            if data == marker:
+                span = None
+                while span is None:
+                    chunk = f.read(64 * 1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                    span = _entry_span(data, 0)
+                body = _parse_entry_body(data[:span[0]]) if span else None
+                if body is not None:
+                    return body
+    except (IOError, EOFError, gzip.BadGzipFile, zlib.error) as e:
+        print(f"Warning: Could not read knowledge entry {record.id}: {e}")
+
+    if not _is_knowledge_base_path(record._source):
+        return {}
+    for _, data in _read_segments("all"):
+        for start, end, entry_id in _iter_entries(data):
+            if entry_id == record.id:
+                body = _parse_entry_body(data[start:end])
+                if body is not None:
+                    return body
+    return {}
+
+def _parse_duration(value: str | None) -> float | None:
+    """
+    Parses a duration_ms header value; entries written before it existed have none.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _index_segment(source: str, data: bytes) -> list[HistoryRecord]:
+    """
+    Builds records for every entry of a raw segment, parsing only the header lines.
+    """
+    records = []
+    for pos, end, _ in _iter_entries(data):
+        header_start = pos + 4 # skip the leading "---\n"
+        header_end = data.find(_HEADER_END, header_start, end)
+        if header_end == -1:
             continue
-        
-        entry_data = {}
+        fields = {}
+        for line in data[header_start:header_end].decode("utf-8", errors="replace").split("\n"):
+            key, _, value = line.partition(":")
+            fields[key.strip()] = value.strip()
         try:
-            # Use regex to parse the structured parts
-            for line in entry_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    entry_data[key.strip()] = value.strip().replace('`','')
-            
-            history.append(entry_data)
-        except Exception as e:
-            print(f"Warning: Could not parse a knowledge entry. Error: {e}")
-            continue
-            
-    return history
+            records.append(HistoryRecord(
+                id=fields["id"],
+                timestamp=fields.get("timestamp", ""),
+                goal=fields.get("goal", "").strip('"'),
+                task=fields.get("task", "").replace('`', ''),
+                command=fields.get("command", "").replace('`', ''),
+                status=fields.get("status", "").replace('`', ''),
+                duration_ms=_parse_duration(fields.get("duration_ms")),
+                source=source,
+                offset=pos,
+            ))
+        except KeyError as e:
+            print(f"Warning: Could not parse a knowledge entry. Missing field: {e}")
+    return records
+
+class KnowledgeHistory(collections.abc.Sequence):
+    """
+    Read-only, ordered sequence of HistoryRecord objects (oldest first), with views
+    that walk the index without copying or loading entry bodies.
+
+    The records are kept per segment, as indexed (archived segments' indexes are shared
+    between reads), and never concatenated; views that look at recent records, such as
+    last() and last_successful(), walk back from the newest segment and stop early.
+    """
+
+    def __init__(self, segments: list[list[HistoryRecord]]):
+        """
+        :param segments: Per-segment record lists, oldest segment first.
+        """
+        self._segments = [records for records in segments if records]
+        self._ends = list(itertools.accumulate(len(records) for records in self._segments))
+
+    def __len__(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("KnowledgeHistory index out of range")
+        segment = bisect.bisect_right(self._ends, index)
+        start = self._ends[segment - 1] if segment else 0
+        return self._segments[segment][index - start]
+
+    def __iter__(self):
+        for records in self._segments:
+            yield from records
+
+    def __reversed__(self):
+        for records in reversed(self._segments):
+            yield from reversed(records)
+
+    def last(self, n: int = 1) -> list[HistoryRecord]:
+        """
+        Returns the last n records, oldest first.
+        """
+        return list(itertools.islice(reversed(self), max(n, 0)))[::-1]
+
+    def last_successful(self) -> HistoryRecord | None:
+        """
+        Returns the most recent record with status Success, or None.
+        """
+        for record in reversed(self):
+            if record.status == "Success":
+                return record
+        return None
+
+    def filter_by_status(self, status: str):
+        """
+        Yields the records with the given status, oldest first.
+        """
+        for record in self:
+            if record.status == status:
+                yield record
+
+def read_knowledge_log(path: str) -> tuple[bytes, KnowledgeHistory]:
+    """
+    Reads a saved knowledge log outside the knowledge base, e.g. a copy of KNOWLEDGE.md
+    from an earlier run or an archived .md.gz segment. Neither reads nor locks the live
+    knowledge base. A torn entry at the end of the log is left out.
+    :return: A tuple of (raw log content, KnowledgeHistory of its entries).
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        data = _complete_prefix(f.read())
+    return data, KnowledgeHistory([_index_segment(path, data)])
+
+def read_knowledge_history(scope: str = "working") -> KnowledgeHistory:
+    """
+    Reads the knowledge log into a compact KnowledgeHistory of HistoryRecord objects.
+    Only entry headers are parsed; bodies (stdout/stderr/learning) are loaded on access.
+    Archived segments never change, so each is read and indexed once and its index is
+    reused by later reads; only the active segment is re-indexed every time.
+    :param scope: One of HISTORY_SCOPES. The default covers the whole current run,
+                  even if some of it has already been rotated into the archive.
+    """
+    global _archived_index_cache
+    if scope not in HISTORY_SCOPES:
+        raise ValueError(f"Unknown knowledge scope: {scope}")
+
+    flush_knowledge_writer()
+    segments = []
+    cache = {}
+    with knowledge_lock():
+        if scope != "active":
+            for segment in list_knowledge_segments(include_consolidated=(scope == "all")):
+                key = (ARCHIVE_DIR, segment["sequence"], segment.get("archived_at"))
+                records = _archived_index_cache.get(key)
+                if records is None:
+                    archived = _read_archived_segment(segment)
+                    if archived is None:
+                        continue
+                    records = _index_segment(*archived)
+                cache[key] = records
+                segments.append(records)
+        active = _read_active_segment()
+        if active is not None:
+            segments.append(_index_segment(KNOWLEDGE_FILE, active))
+        # Only the segments of the latest read are kept, which bounds the cache.
+        _archived_index_cache = cache
+    return KnowledgeHistory(segments)
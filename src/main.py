@@ -1,80 +1,134 @@
 """
 Main entry point for the G.E.A.R. agent.
 Orchestrates the goal-oriented, reactive loop of the agent.
+
+The loop is asyncio-native (main_loop_async / execute_task_async): shell commands and
+web actions are awaited without blocking, GUI actions run on the GUI controller's own
+thread and knowledge I/O in worker threads, and every step is bounded by STEP_TIMEOUT and can be cancelled with
+SIGINT/SIGTERM. main_loop and execute_task are the synchronous entry points on top of it.
 """
 
-import time
+import argparse
+import asyncio
+import functools
 import os
 import json
+import signal
+import time
 
-from src.task_executor import execute_shell_command
-from src.knowledge_manager import record_knowledge, read_knowledge_history
-from src.gui_controller import GUIController, WebController
-from src.planner import determine_next_step
+from src.task_executor import execute_shell_command_async
+from src.knowledge_manager import KnowledgeHistory, record_knowledge, read_knowledge_history, flush_knowledge_writer, close_knowledge_writer
+from src.checkpoint import save_checkpoint, load_checkpoint, clear_checkpoint
+from src.gui_controller import GUIController, WebController, AsyncWebController
+from src.planner import PlanStep, determine_next_plan
+from src.shell_cache import ShellResultCache
+from src.resource_governor import RunBudget, load_goal_budget
 
 GOAL_FILE = "goal.txt"
 MAX_LOOPS = 10 # Safety break to prevent infinite loops
+STEP_TIMEOUT = 600 # Seconds a single task may run before it is cancelled
+STEP_PAUSE = 2 # Seconds to pause between steps
+# Regex patterns of read-only `shell:` commands whose results may be served from the
+# cache without marking them `shell_cached:`, e.g. (r"git status", r"python --version").
+SHELL_CACHE_ALLOWLIST = ()
+
+def _parse_action(task: str) -> tuple[str, dict]:
+    """
+    Splits a `type: action: {json params}` task into its action and parameters.
+    """
+    parts = task.split(':', 2)
+    action = parts[1].strip()
+    params_str = parts[2].strip() if len(parts) > 2 else "{}"
+    return action, json.loads(params_str)
 
-def execute_task(task: str, gui_controller: GUIController, web_controller: WebController) -> tuple[bool, str, str, str]:
+def _parse_shell_task(task: str, shell_cache: ShellResultCache | None) -> tuple[str, dict | None]:
+    """
+    Extracts the command of a `shell:` or `shell_cached:` task.
+    Returns the command and the keyword arguments for ShellResultCache.run_async, or None if
+    the command must not be served from the cache.
     """
-    Executes a single task string.
+    if task.startswith('shell_cached:'):
+        params = json.loads(task.split('shell_cached:', 1)[1].strip())
+        command = params.get("command", "")
+        if shell_cache is None:
+            return command, None
+        return command, {"env_vars": params.get("env", []), "inputs": params.get("inputs", []), "ttl": params.get("ttl")}
+
+    command = task.split('shell:', 1)[1].strip()
+    if shell_cache is not None and shell_cache.is_allowlisted(command):
+        return command, {}
+    return command, None
+
+def _gui_action_map(gui_controller: GUIController, params: dict) -> dict:
+    return {
+        'start': lambda: gui_controller.start_application(path=params.get("path"), title_re=params.get("title"), aumid=params.get("aumid")),
+        'close': lambda: gui_controller.close_current_application(),
+        'close_by_name': lambda: gui_controller.close_application_by_name(params.get("app_name")),
+        'click': lambda: gui_controller.click_element(params.get("control_identifiers")),
+        'type': lambda: gui_controller.type_text_in_element(params.get("control_identifiers"), params.get("text")),
+        'keys': lambda: gui_controller.send_keys_to_app(params.get("keys")),
+        'print_identifiers': lambda: (gui_controller.print_app_control_identifiers(), "Printed to console")[0],
+    }
+
+def _web_action_map(web_controller: AsyncWebController, params: dict) -> dict:
+    # Every entry returns a coroutine to be awaited.
+    return {
+        'launch': lambda: web_controller.launch_browser(browser_type=params.get("browser_type", "chromium"), headless=params.get("headless", True)),
+        'navigate': lambda: web_controller.navigate(params.get("url")),
+        'type': lambda: web_controller.type_text_web(params.get("selector"), params.get("text")),
+        'click': lambda: web_controller.click_element_web(params.get("selector")),
+        'wait': lambda: web_controller.wait_for_selector(
+            params.get("selector"),
+            state=params.get("state", "visible"),
+            timeout=params.get("timeout", 30000)
+        ),
+        'close': lambda: web_controller.close_browser(),
+    }
+
+async def execute_task_async(task: str, gui_controller: GUIController, web_controller: AsyncWebController, shell_cache: ShellResultCache | None = None, shell_executor=execute_shell_command_async) -> tuple[bool, str, str, str]:
+    """
+    Executes a single task string. Shell commands run via asyncio subprocesses, web
+    actions via Playwright's async API, and the blocking GUI actions on the GUI controller's thread.
+    shell_executor is the coroutine function that runs shell commands.
+    Shell results are served from shell_cache, if given, for `shell_cached:` tasks and for
+    allowlisted `shell:` commands; the recorded command is then suffixed with "[cache hit]".
     Returns a tuple of (success, command, stdout, stderr).
     """
     success, stdout, stderr = False, "", ""
     command = "n/a"
 
     try:
-        if task.startswith('shell:'):
-            command = task.split('shell:', 1)[1].strip()
-            success, stdout, stderr = execute_shell_command(command)
+        if task.startswith(('shell:', 'shell_cached:')):
+            command, cache_options = _parse_shell_task(task, shell_cache)
+            if cache_options is None:
+                success, stdout, stderr = await shell_executor(command)
+            else:
+                success, stdout, stderr, cache_hit = await shell_cache.run_async(command, shell_executor, **cache_options)
+                if cache_hit:
+                    command = f"{command} [cache hit]"
 
         elif task.startswith('gui:'):
-            parts = task.split(':', 2)
-            action = parts[1].strip()
-            params_str = parts[2].strip() if len(parts) > 2 else "{}"
-            params = json.loads(params_str)
+            action, params = _parse_action(task)
             command = f"gui:{action}"
 
-            action_map = {
-                'start': lambda: gui_controller.start_application(path=params.get("path"), title_re=params.get("title"), aumid=params.get("aumid")),
-                'close': lambda: gui_controller.close_current_application(),
-                'close_by_name': lambda: gui_controller.close_application_by_name(params.get("app_name")),
-                'click': lambda: gui_controller.click_element(params.get("control_identifiers")),
-                'type': lambda: gui_controller.type_text_in_element(params.get("control_identifiers"), params.get("text")),
-                'keys': lambda: gui_controller.send_keys_to_app(params.get("keys")),
-                'print_identifiers': lambda: (gui_controller.print_app_control_identifiers(), "Printed to console")[0],
-            }
+            action_map = _gui_action_map(gui_controller, params)
             if action in action_map:
-                success = action_map[action]()
+                success = await gui_controller.run_async(action_map[action])
                 stdout = f"GUI action '{action}' executed."
             else:
                 stderr = f"Unsupported GUI action: {action}"
 
         elif task.startswith('web:'):
-            parts = task.split(':', 2)
-            action = parts[1].strip()
-            params_str = parts[2].strip() if len(parts) > 2 else "{}"
-            params = json.loads(params_str)
+            action, params = _parse_action(task)
             command = f"web:{action}"
 
-            action_map = {
-                'launch': lambda: web_controller.launch_browser(browser_type=params.get("browser_type", "chromium"), headless=params.get("headless", True)),
-                'navigate': lambda: web_controller.navigate(params.get("url")),
-                'type': lambda: web_controller.type_text_web(params.get("selector"), params.get("text")),
-                'click': lambda: web_controller.click_element_web(params.get("selector")),
-                'wait': lambda: web_controller.wait_for_selector(
-                    params.get("selector"),
-                    state=params.get("state", "visible"),
-                    timeout=params.get("timeout", 30000)
-                ),
-                'close': lambda: web_controller.close_browser(),
-            }
+            action_map = _web_action_map(web_controller, params)
             if action in action_map:
-                success = action_map[action]()
+                success = await action_map[action]()
                 stdout = f"Web action '{action}' executed."
             else:
                 stderr = f"Unsupported Web action: {action}"
-        
+
         else:
             stderr = f"Unknown task type for task: {task}"
 
@@ -88,74 +142,340 @@ def execute_task(task: str, gui_controller: GUIController, web_controller: WebCo
 
     return success, command, stdout, stderr
 
+def execute_task(task: str, gui_controller: GUIController, web_controller: WebController, shell_cache: ShellResultCache | None = None) -> tuple[bool, str, str, str]:
+    """
+    Synchronous entry point to execute_task_async, for callers outside an event loop.
+    The task runs on the web controller's event loop, which its browser session is bound to.
+    Returns a tuple of (success, command, stdout, stderr).
+    """
+    return web_controller.run(execute_task_async(task, gui_controller, web_controller.async_controller, shell_cache))
+
 # --- Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 GOAL_FILE = os.path.join(PROJECT_ROOT, "goal.txt")
+GOAL_BUDGET_FILE = os.path.join(PROJECT_ROOT, "goal_budget.json") # Optional run budget and task limits of the goal
 
-def main_loop():
+def _install_cancel_handlers(cancel_event: asyncio.Event) -> None:
     """
-    The main operational loop of the G.E.A.R. agent.
+    Sets cancel_event on SIGINT/SIGTERM so the running step can be cancelled cleanly.
+    Where the event loop does not support signal handlers (Windows), Ctrl+C instead
+    cancels the whole loop through asyncio.run.
     """
-    if not os.path.exists(GOAL_FILE) or os.path.getsize(GOAL_FILE) == 0:
-        print("INFO: Goal file is empty or does not exist. Agent has nothing to do.")
-        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, cancel_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
 
-    with open(GOAL_FILE, "r", encoding="utf-8") as f:
-        high_level_goal = f.read().strip()
+def _add_phase_time(phase_times: dict | None, phase: str, started: float) -> None:
+    """
+    Adds the time since `started` to a phase of the phase_times breakdown, if one is collected.
+    """
+    if phase_times is not None:
+        phase_times[phase] = phase_times.get(phase, 0.0) + time.perf_counter() - started
 
-    print(f"G.E.A.R. agent starting with goal: \"{high_level_goal}\"")
+async def _record(previous: asyncio.Task | None, checkpoint: dict | None = None, phase_times: dict | None = None, **entry) -> None:
+    """
+    Records a step's outcome and saves the checkpoint taken after it (once the entry is
+    on disk, so a checkpoint never runs ahead of the log), off the event loop.
+    Waits for the previous step's record first, so entries are written in order.
+    Its time overlaps with the following steps, so it is accumulated as "record_background".
+    """
+    if previous is not None:
+        await previous
+    started = time.perf_counter()
+    await asyncio.to_thread(record_knowledge, **entry)
+    if checkpoint is not None:
+        await asyncio.to_thread(flush_knowledge_writer)
+        await asyncio.to_thread(save_checkpoint, checkpoint)
+    _add_phase_time(phase_times, "record_background", started)
 
-    gui_controller = GUIController()
-    web_controller = WebController()
-    
+async def _observe(pending_record: asyncio.Task | None) -> KnowledgeHistory:
+    """
+    Reads the history once the pending records have landed, off the event loop.
+    """
+    if pending_record is not None:
+        await pending_record
+    return await asyncio.to_thread(read_knowledge_history)
+
+async def _execute_bounded(task: str, gui_controller: GUIController, web_controller: AsyncWebController, shell_cache: ShellResultCache | None, shell_executor, cancel_event: asyncio.Event, timeout: float = STEP_TIMEOUT) -> tuple[bool, str, str, str]:
+    """
+    Runs execute_task_async bounded by timeout and cancelled when cancel_event is set.
+    Returns a tuple of (success, command, stdout, stderr).
+    """
+    step = asyncio.create_task(asyncio.wait_for(
+        execute_task_async(task, gui_controller, web_controller, shell_cache, shell_executor),
+        timeout
+    ))
+    cancel_wait = asyncio.create_task(cancel_event.wait())
+    await asyncio.wait({step, cancel_wait}, return_when=asyncio.FIRST_COMPLETED)
+    cancel_wait.cancel()
+
+    if not step.done():
+        step.cancel()
+        await asyncio.gather(step, return_exceptions=True)
+        return False, "n/a", "", "Task cancelled by a cancel signal."
+    try:
+        return step.result()
+    except asyncio.TimeoutError:
+        return False, "n/a", "", f"Task timed out after {timeout:.0f} seconds."
+
+async def _resume_from_checkpoint(high_level_goal: str, gui_controller: GUIController, web_controller: AsyncWebController) -> tuple[int, float, list[PlanStep]]:
+    """
+    Restores the controllers and the planner state from the last checkpoint of an
+    interrupted run of this goal.
+    Returns the loop counter, the elapsed run time (in seconds) and the remaining steps of
+    the plan that was being executed, or (0, 0.0, []) if there is nothing to resume.
+    """
+    checkpoint = load_checkpoint()
+    if checkpoint is None:
+        print("WARNING: No checkpoint to resume from. Starting from the beginning.")
+        return 0, 0.0, []
+    if checkpoint.get("goal") != high_level_goal:
+        print("WARNING: The checkpoint belongs to a different goal. Starting from the beginning.")
+        return 0, 0.0, []
+
+    restore_started = time.perf_counter()
+    if checkpoint.get("web") and not await web_controller.restore_state(checkpoint["web"]):
+        print("WARNING: Could not restore the browser session from the checkpoint.")
+    if checkpoint.get("gui") and not await gui_controller.run_async(gui_controller.restore_state, checkpoint["gui"]):
+        print("WARNING: Could not reconnect to the application from the checkpoint.")
+    restore_seconds = time.perf_counter() - restore_started
+
+    elapsed_seconds = checkpoint.get("elapsed_s", 0.0)
+    print(f"INFO: Resuming after loop {checkpoint['loop_count']} "
+          f"(last completed task: {checkpoint['planner'].get('last_successful_task')}). "
+          f"Restored state in {restore_seconds:.2f} s instead of redoing {elapsed_seconds:.2f} s of completed work "
+          f"(saved {elapsed_seconds - restore_seconds:.2f} s).")
+
+    plan = [PlanStep.from_dict(step) for step in checkpoint["planner"].get("pending_plan", [])]
+    if plan:
+        print(f"INFO: Continuing the interrupted plan with {len(plan)} remaining step(s).")
+    return checkpoint["loop_count"], elapsed_seconds, plan
+
+async def run_goal_async(
+    high_level_goal: str,
+    gui_controller: GUIController,
+    web_controller: AsyncWebController,
+    shell_cache: ShellResultCache | None = None,
+    shell_executor=execute_shell_command_async,
+    resume: bool = False,
+    max_loops: int = MAX_LOOPS,
+    step_pause: float = STEP_PAUSE,
+    checkpoints: bool = True,
+    cancel_event: asyncio.Event | None = None,
+    phase_times: dict | None = None,
+    budget: RunBudget | None = None
+) -> int:
+    """
+    Runs the Observe-Decide-Act-Record loop for a goal with the given controllers.
+    :param shell_executor: Coroutine function running shell commands.
+    :param resume: Continue an interrupted run from its last checkpoint instead of starting fresh.
+    :param max_loops: Safety bound on the number of loop iterations.
+    :param step_pause: Seconds to pause between steps (0 disables pacing).
+    :param checkpoints: Whether to checkpoint the run after each successful step.
+    :param cancel_event: Event that cancels the running step and stops the loop when set.
+    :param phase_times: Dict in which seconds spent per phase (observe, decide, act,
+                        record) are accumulated, for benchmarking the loop itself. Only
+                        time the loop waits for counts, so the phases add up to at most
+                        the wall time; the record writes that overlap with later steps
+                        are accumulated separately as "record_background".
+    :param budget: Step and time budget of the run (unbounded if not given). Its usage
+                   is reported when the loop ends.
+    :return: The number of loop iterations run.
+    """
+    if cancel_event is None:
+        cancel_event = asyncio.Event()
+    if budget is None:
+        budget = RunBudget()
+
+    # The current plan is executed straight through; the loop only re-observes and
+    # re-plans once it is exhausted or a step's pre/postcondition is not met.
+    plan: list[PlanStep] = []
+    # Records are chained so they land in order, and overlap with the following steps.
+    # Reading the history for the next plan overlaps with the pause between plans.
+    pending_record = None
+    pending_observation = None
     loop_count = 0
+    resumed_elapsed = 0.0
     try:
-        while loop_count < MAX_LOOPS:
+        if resume:
+            loop_count, resumed_elapsed, plan = await _resume_from_checkpoint(high_level_goal, gui_controller, web_controller)
+        budget.start(steps=loop_count, elapsed_s=resumed_elapsed)
+
+        while loop_count < max_loops:
+            if cancel_event.is_set():
+                print("INFO: Cancel requested. Stopping.")
+                break
             loop_count += 1
-            print(f"\n--- Agent Loop {loop_count}/{MAX_LOOPS} ---")
+            print(f"\n--- Agent Loop {loop_count}/{max_loops} ---")
+
+            if not plan:
+                # 1. OBSERVE: Read the history of actions
+                started = time.perf_counter()
+                if pending_observation is not None:
+                    history = await pending_observation
+                    pending_observation = None
+                else:
+                    history = await _observe(pending_record)
+                pending_record = None
+                _add_phase_time(phase_times, "observe", started)
 
-            # 1. OBSERVE: Read the history of actions
-            history = read_knowledge_history()
+                # 2. ORIENT & DECIDE: Determine the next steps
+                started = time.perf_counter()
+                plan = determine_next_plan(high_level_goal, history) or []
+                _add_phase_time(phase_times, "decide", started)
 
-            # 2. ORIENT & DECIDE: Determine the next step
-            next_task = determine_next_step(high_level_goal, history)
+                if not plan:
+                    print("INFO: Goal achieved or no further steps can be determined. Shutting down.")
+                    if checkpoints:
+                        await asyncio.to_thread(clear_checkpoint)
+                    break
+                if len(plan) > 1:
+                    print(f"INFO: Executing a {len(plan)}-step plan.")
 
-            if next_task is None:
-                print("INFO: Goal achieved or no further steps can be determined. Shutting down.")
+            # Checked once the next step is known, so a run that used up its budget on
+            # its last step still gets to observe that the goal is complete.
+            exhausted = budget.exhausted()
+            if exhausted:
+                print(f"WARNING: Run budget exhausted ({exhausted}). Stopping.")
                 break
 
-            # 3. ACT: Execute the task
-            print(f"--> Executing task: {next_task}")
-            success, command, stdout, stderr = execute_task(next_task, gui_controller, web_controller)
+            step = plan.pop(0)
+            budget.charge_step()
+            remaining_s = budget.remaining_s()
+            step_timeout = STEP_TIMEOUT if remaining_s is None else min(STEP_TIMEOUT, remaining_s)
+
+            # 3. ACT: Check the precondition, execute the task, check the postcondition.
+            # A check that is not met fails the step, so it is recorded and stops the run.
+            step_started = time.perf_counter()
+            unmet_check = None
+            if step.precondition:
+                met, command, stdout, stderr = await _execute_bounded(step.precondition, gui_controller, web_controller, shell_cache, shell_executor, cancel_event, step_timeout)
+                if not met:
+                    unmet_check = f"Precondition '{step.precondition}' was not met; the task was not executed."
+
+            if unmet_check is None:
+                print(f"--> Executing task: {step.task}")
+                success, command, stdout, stderr = await _execute_bounded(step.task, gui_controller, web_controller, shell_cache, shell_executor, cancel_event, step_timeout)
+                if success and step.postcondition:
+                    met, _, _, check_stderr = await _execute_bounded(step.postcondition, gui_controller, web_controller, shell_cache, shell_executor, cancel_event, step_timeout)
+                    if not met:
+                        unmet_check = f"Postcondition '{step.postcondition}' was not met."
+                        stderr = f"{stderr}\n{check_stderr}".strip()
+
+            learning = f"Executed task '{step.task}' as part of goal '{high_level_goal}'."
+            if unmet_check is not None:
+                print(f"WARNING: {unmet_check}")
+                success = False
+                stderr = f"{stderr}\n{unmet_check}".strip()
+                learning += f" {unmet_check}"
+            duration_ms = (time.perf_counter() - step_started) * 1000
             status = "Success" if success else "Failure"
             print(f"--> Task status: {status}")
+            _add_phase_time(phase_times, "act", step_started)
 
-            # 4. RECORD: Record the outcome
-            learning = f"Executed task '{next_task}' as part of goal '{high_level_goal}'."
-            record_knowledge(
+            # 4. RECORD: Record the outcome, and checkpoint the run after a successful step
+            started = time.perf_counter()
+            checkpoint = None
+            if success and checkpoints:
+                checkpoint = {
+                    "goal": high_level_goal,
+                    "loop_count": loop_count,
+                    "planner": {"last_successful_task": step.task, "pending_plan": [pending.to_dict() for pending in plan]},
+                    "web": await web_controller.export_state(),
+                    "gui": await gui_controller.run_async(gui_controller.export_state),
+                    "elapsed_s": budget.elapsed_s,
+                }
+            pending_record = asyncio.create_task(_record(
+                pending_record,
+                checkpoint=checkpoint,
+                phase_times=phase_times,
                 high_level_goal=high_level_goal,
-                task=next_task,
+                task=step.task,
                 command=command,
                 status=status,
                 stdout=stdout,
                 stderr=stderr,
-                learning=learning
-            )
+                learning=learning,
+                duration_ms=duration_ms
+            ))
+            _add_phase_time(phase_times, "record", started)
 
             if not success:
                 print(f"ERROR: Task failed. See assets/KNOWLEDGE.md for details. Stopping for safety.")
                 break
-            
-            time.sleep(2) # Pause between steps
+
+            if not plan:
+                pending_observation = asyncio.create_task(_observe(pending_record))
+                pending_record = None
+                if step_pause > 0:
+                    await asyncio.sleep(step_pause) # Pause between plans
 
     except Exception as e:
         print(f"FATAL: An unexpected exception broke the main loop: {e}")
+    finally:
+        started = time.perf_counter()
+        await asyncio.gather(*(task for task in (pending_record, pending_observation) if task is not None), return_exceptions=True)
+        _add_phase_time(phase_times, "record", started) # Waiting for the last records to land
+        print(f"INFO: Run budget used: {budget.format_usage()}")
+    return loop_count
+
+async def main_loop_async(resume: bool = False):
+    """
+    The main operational loop of the G.E.A.R. agent, on asyncio.
+    :param resume: Continue an interrupted run from its last checkpoint instead of starting fresh.
+    """
+    if not os.path.exists(GOAL_FILE) or os.path.getsize(GOAL_FILE) == 0:
+        print("INFO: Goal file is empty or does not exist. Agent has nothing to do.")
+        return
+
+    with open(GOAL_FILE, "r", encoding="utf-8") as f:
+        high_level_goal = f.read().strip()
+
+    print(f"G.E.A.R. agent starting with goal: \"{high_level_goal}\"")
+
+    gui_controller = GUIController()
+    web_controller = AsyncWebController()
+    shell_cache = ShellResultCache(allowlist=SHELL_CACHE_ALLOWLIST)
+    budget = load_goal_budget(GOAL_BUDGET_FILE)
+    # A per-goal step budget replaces the MAX_LOOPS safety bound, with one more
+    # iteration to observe that the goal is complete after the last step.
+    max_loops = budget.max_steps + 1 if budget.max_steps is not None else MAX_LOOPS
+    cancel_event = asyncio.Event()
+    _install_cancel_handlers(cancel_event)
+
+    try:
+        await run_goal_async(
+            high_level_goal,
+            gui_controller,
+            web_controller,
+            shell_cache=shell_cache,
+            shell_executor=functools.partial(execute_shell_command_async, limits=budget.task_limits),
+            resume=resume,
+            cancel_event=cancel_event,
+            max_loops=max_loops,
+            budget=budget
+        )
     finally:
         # Cleanup resources
         if web_controller.browser:
-            web_controller.close_browser()
+            await web_controller.close_browser()
+        gui_controller.shutdown()
+        await asyncio.to_thread(close_knowledge_writer)
         print("\n--- G.E.A.R. agent shutdown complete. ---")
 
+def main_loop(resume: bool = False):
+    """
+    The main operational loop of the G.E.A.R. agent.
+    Synchronous entry point; runs main_loop_async on a fresh event loop.
+    """
+    asyncio.run(main_loop_async(resume=resume))
+
 
 if __name__ == "__main__":
-    main_loop()
+    parser = argparse.ArgumentParser(description="Run the G.E.A.R. agent on the goal in goal.txt.")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run from its last checkpoint.")
+    args = parser.parse_args()
+    main_loop(resume=args.resume)
@@ -1,45 +1,71 @@
 '''
 This module is responsible for consolidating the verbose knowledge log
 into a high-level episodic memory summary.
+
+Besides the human-readable summary in EPISODIC_MEMORY.md, every episode is appended
+as one JSON line to EPISODES.jsonl, with per-step action types, statuses and timings,
+for src.episode_analytics.
+
+Saved logs of earlier runs can be summarized in bulk on a process pool:
+
+    python -m src.memory_summarizer --backfill DIR_OR_GLOB [--workers N]
+
+Each log (.md or .md.gz) becomes one episode. Results are merged in path order, and
+logs whose content was summarized before (by SHA-256, in BACKFILL_MANIFEST.json) are
+skipped, so a backfill can be re-run over a growing archive.
 '''
 
+import argparse
+import concurrent.futures
+import datetime
+import glob
+import hashlib
+import json
 import os
-import re
+import time
+import uuid
+import zlib
+
+from src.knowledge_manager import (
+    KnowledgeHistory,
+    HistoryRecord,
+    mark_segments_consolidated,
+    read_knowledge_history,
+    read_knowledge_log,
+    rotate_knowledge_segment,
+)
 
-KNOWLEDGE_FILE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'KNOWLEDGE.md')
 EPISODIC_MEMORY_FILE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'EPISODIC_MEMORY.md')
+EPISODES_FILE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'EPISODES.jsonl')
+BACKFILL_MANIFEST_FILE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'BACKFILL_MANIFEST.json')
+BACKFILL_PATTERNS = ("*.md", "*.md.gz")
 
-def summarize_knowledge_to_episodic_memory():
+def _action_name(record: HistoryRecord) -> str:
     """
-    Reads the raw KNOWLEDGE.md, creates a summary, and appends it to EPISODIC_MEMORY.md.
-    Then, it clears the raw knowledge file for the next run.
+    Returns the action of a step, e.g. "web:navigate" or "shell".
     """
-    if not os.path.exists(KNOWLEDGE_FILE):
-        print("INFO: No knowledge file to summarize.")
-        return
-
-    with open(KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    if not content.strip():
-        print("INFO: Knowledge file is empty. No summary generated.")
-        return
-
-    # --- Basic Summary Generation Logic ---
-    goal_match = re.search(r'goal: "(.*?)"\n', content)
-    goal = goal_match.group(1) if goal_match else "Unknown Goal"
+    if record.task_type in ("gui", "web"):
+        parts = record.task.split(':', 2)
+        if len(parts) > 1:
+            return f"{record.task_type}:{parts[1].strip()}"
+    return record.task_type
 
-    entries = content.strip().split('---\n')
-    task_count = len(entries)
-    final_entry = entries[-1]
-    status_match = re.search(r"- \*\*Status:\*\* `(.*)`", final_entry)
-    final_status = status_match.group(1) if status_match else "Unknown"
+def build_episode(history: KnowledgeHistory, episode_id: str | None = None) -> tuple[str, dict]:
+    """
+    Builds the markdown summary and the structured episode record of a run.
+    :param history: The non-empty history of the run.
+    :param episode_id: Id of the episode; a random one is generated if not given.
+    :return: A tuple of (markdown summary, episode record).
+    """
+    final_record = history[-1]
+    goal = final_record.goal or "Unknown Goal"
+    final_status = final_record.status or "Unknown"
 
     summary = f"""## Episode Summary
 
 - **Goal:** {goal}
 - **Outcome:** {final_status}
-- **Total Steps:** {task_count}
+- **Total Steps:** {len(history)}
 
 ### Narrative
 """
@@ -47,21 +73,180 @@ def summarize_knowledge_to_episodic_memory():
     if final_status == "Success":
         summary += "The agent successfully completed the goal by executing a series of tasks."
     else:
-        error_match = re.search(r"- \*\*Stderr:\*\*\n```\n(.*?)\n```", final_entry, re.DOTALL)
-        error_details = error_match.group(1).strip() if error_match else "No specific error message found."
-        summary += f"The agent failed to complete the goal. The final error was: {error_details}"
-    
+        error_details = final_record.get("stderr") or "No specific error message found."
+        summary += f"The agent failed to complete the goal. The final error was: {error_details.strip()}"
+
     summary += "\n---\n"
 
+    steps = [{
+        "task": record.task,
+        "action_type": record.task_type,
+        "action": _action_name(record),
+        "status": record.status,
+        "timestamp": record.timestamp,
+        "duration_ms": record.duration_ms,
+    } for record in history]
+    episode = {
+        "episode_id": episode_id or str(uuid.uuid4()),
+        "goal": goal,
+        "outcome": final_status,
+        "started_at": history[0].timestamp,
+        "ended_at": final_record.timestamp,
+        "total_steps": len(history),
+        "total_duration_ms": sum(step["duration_ms"] or 0.0 for step in steps),
+        "steps": steps,
+    }
+    return summary, episode
+
+def summarize_knowledge_to_episodic_memory():
+    """
+    Reads the working knowledge log (archived segments of the current run plus the
+    active KNOWLEDGE.md), creates a summary, and appends it to EPISODIC_MEMORY.md and
+    EPISODES.jsonl. Then, it archives the active segment and marks the run's segments as
+    consolidated, so the next run starts with an empty working memory while the raw
+    record is kept.
+    """
+    history = read_knowledge_history(scope="working")
+
+    if not history:
+        print("INFO: Working memory is empty. No summary generated.")
+        return
+
+    summary, episode = build_episode(history)
+
     # Append to episodic memory
     with open(EPISODIC_MEMORY_FILE, "a", encoding="utf-8") as f:
         f.write(summary)
+    with open(EPISODES_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(episode) + "\n")
 
-    # Clear the working memory (raw knowledge file)
-    with open(KNOWLEDGE_FILE, "w", encoding="utf-8") as f:
-        f.write("")
+    # Clear the working memory: the raw log moves to the compressed archive
+    rotate_knowledge_segment()
+    mark_segments_consolidated()
 
-    print(f"INFO: Episodic memory updated and working memory cleared.")
+    print(f"INFO: Episodic memory updated and working memory archived.")
+
+def _find_logs(path_or_glob: str) -> list[str]:
+    """
+    Returns the knowledge logs in a directory (recursively) or matching a glob, sorted by path.
+    """
+    if os.path.isdir(path_or_glob):
+        paths = []
+        for pattern in BACKFILL_PATTERNS:
+            paths.extend(glob.glob(os.path.join(path_or_glob, "**", pattern), recursive=True))
+    else:
+        paths = glob.glob(path_or_glob, recursive=True)
+    return sorted({os.path.abspath(path) for path in paths if os.path.isfile(path)})
+
+def _load_backfill_manifest() -> dict:
+    if not os.path.exists(BACKFILL_MANIFEST_FILE):
+        return {}
+    try:
+        with open(BACKFILL_MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError) as e:
+        print(f"Error reading backfill manifest: {e}")
+        return {}
+
+def _save_backfill_manifest(manifest: dict) -> None:
+    """
+    Atomically replaces the backfill manifest.
+    """
+    tmp_path = BACKFILL_MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, BACKFILL_MANIFEST_FILE)
+
+_known_digests = frozenset()
+
+def _init_backfill_worker(known_digests: frozenset) -> None:
+    global _known_digests
+    _known_digests = known_digests
+
+def _summarize_log(path: str) -> tuple[str, str | None, int, str | None, dict | None]:
+    """
+    Worker: summarizes one saved knowledge log.
+    The episode id is derived from the content hash, so re-running a backfill is deterministic.
+    :return: A tuple of (path, content SHA-256 or None if unreadable, size in bytes,
+             markdown summary, episode record). Summary and episode are None if the log
+             was summarized before, is empty, or could not be read.
+    """
+    try:
+        data, history = read_knowledge_log(path)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in _known_digests or not history:
+            return path, digest, len(data), None, None
+        # Entry bodies are loaded lazily, so a corrupt log can also fail here.
+        summary, episode = build_episode(history, episode_id=str(uuid.UUID(digest[:32])))
+    except (IOError, EOFError, zlib.error, ValueError) as e:
+        print(f"Warning: Could not read knowledge log {path}: {e}")
+        return path, None, 0, None, None
+    return path, digest, len(data), summary, episode
+
+def backfill_episodic_memory(path_or_glob: str, workers: int | None = None) -> dict:
+    """
+    Summarizes saved knowledge logs on a process pool and appends their episodes to
+    EPISODIC_MEMORY.md and EPISODES.jsonl, in path order. Logs whose content is already
+    in the backfill manifest are skipped.
+    :param path_or_glob: A directory (searched recursively for .md and .md.gz logs) or a glob.
+    :param workers: Number of worker processes (default: one per CPU).
+    :return: Counts and throughput of the backfill.
+    """
+    paths = _find_logs(path_or_glob)
+    manifest = _load_backfill_manifest()
+    workers = workers or os.cpu_count() or 1
+    stats = {"logs": len(paths), "summarized": 0, "skipped": 0, "empty": 0, "failed": 0, "bytes": 0, "workers": workers}
+
+    started = time.perf_counter()
+    if paths:
+        chunksize = max(1, len(paths) // (workers * 4))
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_backfill_worker, initargs=(frozenset(manifest),)) as pool, \
+                 open(EPISODIC_MEMORY_FILE, "a", encoding="utf-8") as summaries, \
+                 open(EPISODES_FILE, "a", encoding="utf-8") as episodes:
+                # map yields results in input order, so the merge is deterministic.
+                for path, digest, size, summary, episode in pool.map(_summarize_log, paths, chunksize=chunksize):
+                    stats["bytes"] += size
+                    if digest is None:
+                        stats["failed"] += 1
+                    elif digest in manifest:
+                        stats["skipped"] += 1 # Summarized before, or a duplicate earlier in this batch
+                    elif summary is None:
+                        stats["empty"] += 1
+                    else:
+                        summaries.write(summary)
+                        episodes.write(json.dumps(episode) + "\n")
+                        manifest[digest] = {
+                            "path": path,
+                            "episode_id": episode["episode_id"],
+                            "summarized_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                        }
+                        stats["summarized"] += 1
+        finally:
+            # Also after an interrupted run, so the episodes it appended are not appended again.
+            _save_backfill_manifest(manifest)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Consolidate G.E.A.R. knowledge logs into episodic memory.")
+    parser.add_argument("--backfill", metavar="DIR_OR_GLOB", help="Summarize saved knowledge logs instead of the working memory.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --backfill (default: one per CPU).")
+    args = parser.parse_args(argv)
+
+    if not args.backfill:
+        summarize_knowledge_to_episodic_memory()
+        return
+
+    stats = backfill_episodic_memory(args.backfill, workers=args.workers)
+    if not stats["logs"]:
+        print(f"INFO: No knowledge logs found at {args.backfill}.")
+        return
+    seconds = stats["seconds"] or 1e-9
+    print(f"INFO: Backfilled {stats['summarized']} of {stats['logs']} logs "
+          f"({stats['skipped']} already summarized, {stats['empty']} empty, {stats['failed']} unreadable) "
+          f"in {stats['seconds']:.2f} s with {stats['workers']} workers: "
+          f"{stats['logs'] / seconds:.1f} logs/s, {stats['bytes'] / seconds / 1024 ** 2:.1f} MiB/s.")
 
 if __name__ == '__main__':
-    summarize_knowledge_to_episodic_memory()
+    main()
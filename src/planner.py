@@ -1,61 +1,116 @@
-
 """
 This module is responsible for determining the next best step for the agent
 based on the high-level goal and the history of previous actions.
+
+For deterministic sequences the planner can return a short plan of several steps.
+The agent loop executes such a plan straight through and only re-observes and
+re-plans once it is exhausted. A step's precondition and postcondition (both optional
+check tasks, e.g. `web: wait: ...`) guard it: if either is not met, the step is
+recorded as a failure and the run stops.
 """
 
 import re
+from typing import Callable
 
-def determine_next_step(high_level_goal: str, history: list[dict]) -> str | None:
+from src.knowledge_manager import KnowledgeHistory
+
+class PlanStep:
     """
-    Determines the next single task to execute based on the goal and history.
+    A single step of a plan: the task to execute plus optional check tasks that must
+    succeed before (precondition) and after (postcondition) it.
+    """
+    __slots__ = ("task", "precondition", "postcondition")
+
+    def __init__(self, task: str, precondition: str | None = None, postcondition: str | None = None):
+        self.task = task
+        self.precondition = precondition
+        self.postcondition = postcondition
+
+    def to_dict(self) -> dict:
+        """
+        Returns the step as a JSON-serializable dict, e.g. for checkpoints.
+        """
+        return {"task": self.task, "precondition": self.precondition, "postcondition": self.postcondition}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlanStep":
+        """
+        Rebuilds a step from to_dict() output.
+        """
+        return cls(data["task"], data.get("precondition"), data.get("postcondition"))
+
+    def __repr__(self) -> str:
+        return f"PlanStep(task={self.task!r})"
+
+def _google_search_plan(high_level_goal: str) -> list[tuple[PlanStep, Callable[[str], bool]]]:
+    """
+    The full plan for a Google search goal, each step paired with a predicate that
+    recognizes the step in the history.
+    """
+    query_match = re.search(r"search for (.*)", high_level_goal, re.IGNORECASE)
+    query = query_match.group(1).strip() if query_match else "large language models"
+    launch_task = 'web: launch: {"headless": false}'
+    search_box_visible = 'web: wait: {"selector": "textarea[name=q]", "timeout": 10000}'
+
+    return [
+        (PlanStep(launch_task), lambda task: task == launch_task),
+        (PlanStep('web: navigate: {"url": "https://www.google.com"}', postcondition=search_box_visible),
+         lambda task: task.startswith('web: navigate:')),
+        (PlanStep(f'web: type: {{"selector": "textarea[name=q]", "text": "{query}"}}'),
+         lambda task: task.startswith('web: type:')),
+        # This is a non-idempotent action, so we need to be careful.
+        # A better check would be to see if the search results are visible.
+        (PlanStep('web: click: {"selector": "input[name=btnK]"}'),
+         lambda task: task.startswith('web: click:')),
+    ]
+
+def determine_next_plan(high_level_goal: str, history: KnowledgeHistory) -> list[PlanStep] | None:
+    """
+    Determines the remaining steps towards the goal based on the goal and history.
 
     This is a state-machine-like planner. It checks the last successful action
-    and decides the next logical step.
+    and returns the rest of the known sequence that follows it.
 
     Args:
         high_level_goal: The user's overall goal.
-        history: A list of dictionaries, each representing a past action.
+        history: The KnowledgeHistory of past actions.
 
     Returns:
-        A string representing the next task, or None if the goal is considered complete.
+        A non-empty list of PlanSteps, or None if the goal is considered complete.
     """
     print(f"INFO: Determining next step for goal: '{high_level_goal}'")
-    
-    last_successful_task = None
-    for event in reversed(history):
-        if event.get('status') == 'Success':
-            last_successful_task = event.get('task')
-            break
-    
+
+    last_successful = history.last_successful()
+    last_successful_task = last_successful.task if last_successful else None
+
     print(f"DEBUG: Last successful task was: '{last_successful_task}'")
 
     # Simple hard-coded logic for searching Google
     if "google" in high_level_goal.lower() and "search" in high_level_goal.lower():
-        query_match = re.search(r"search for (.*)", high_level_goal, re.IGNORECASE)
-        query = query_match.group(1).strip() if query_match else "large language models"
+        plan = _google_search_plan(high_level_goal)
 
         if last_successful_task is None:
-            return 'web: launch: {"headless": false}'
-        
-        if last_successful_task == 'web: launch: {"headless": false}':
-            return f'web: navigate: {{"url": "https://www.google.com"}}'
-            
-        if last_successful_task.startswith('web: navigate:'):
-            return f'web: type: {{"selector": "textarea[name=q]", "text": "{query}"}}'
-
-        if last_successful_task.startswith('web: type:'):
-            # This is a non-idempotent action, so we need to be careful.
-            # A better check would be to see if the search results are visible.
-            # For now, we assume the next step is to click.
-            return f'web: click: {{"selector": "input[name=btnK]"}}'
-        
-        if last_successful_task.startswith('web: click:'):
-            # After clicking search, the main part of this simple goal is done.
-            print("INFO: Planner concludes the goal is complete.")
-            return None # Returning None signifies completion
+            return [step for step, _ in plan]
+
+        for index, (_, is_step) in enumerate(plan):
+            if is_step(last_successful_task):
+                remaining = [step for step, _ in plan[index + 1:]]
+                if not remaining:
+                    # After clicking search, the main part of this simple goal is done.
+                    print("INFO: Planner concludes the goal is complete.")
+                    return None # Returning None signifies completion
+                return remaining
 
     # Default case if no plan is found
     print(f"WARNING: Planner has no next step for goal '{high_level_goal}' with last task '{last_successful_task}'.")
     return None # No further actions can be determined
 
+def determine_next_step(high_level_goal: str, history: KnowledgeHistory) -> str | None:
+    """
+    Determines the next single task to execute based on the goal and history.
+
+    Returns:
+        A string representing the next task, or None if the goal is considered complete.
+    """
+    plan = determine_next_plan(high_level_goal, history)
+    return plan[0].task if plan else None
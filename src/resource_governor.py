@@ -0,0 +1,350 @@
+"""
+This module governs the resources agent tasks may use, so that one runaway command
+cannot stall the host or starve other agents running on it.
+
+Per task, shell commands run in their own process group under a wall-clock timeout,
+CPU-time and address-space rlimits (POSIX only) and a cap on captured output. The
+rlimits are set with `ulimit` by the command's shell rather than in a preexec_fn,
+which is not safe in this multi-threaded process. On a
+breach the whole process group is killed and the limit that was hit is reported in
+the task's stderr, so it ends up in the knowledge log.
+
+Per run, a RunBudget bounds the number of steps and the wall-clock time of a goal.
+Both are configured per goal in an optional JSON file next to goal.txt:
+
+    {
+        "max_steps": 10,
+        "max_seconds": 900,
+        "task_limits": {"timeout_s": 120, "cpu_seconds": 60, "memory_mb": 1024, "output_kb": 512}
+    }
+"""
+
+import asyncio
+import json
+import locale
+import os
+import signal
+import subprocess
+import threading
+import time
+
+import psutil
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+DEFAULT_TASK_TIMEOUT = 300 # Seconds of wall-clock time per shell command
+DEFAULT_CPU_SECONDS = 120 # Seconds of CPU time per process
+# Address space per process. Reserved (not only resident) memory counts, and runtimes
+# such as Node.js or the JVM reserve a lot up front, so this is deliberately generous.
+DEFAULT_MEMORY_BYTES = 8 * 1024 ** 3
+DEFAULT_OUTPUT_BYTES = 1024 ** 2 # Captured bytes per stream (stdout, stderr)
+READ_CHUNK_BYTES = 64 * 1024
+
+LIMIT_WALL_TIME = "wall_time"
+LIMIT_CPU_TIME = "cpu_time"
+LIMIT_MEMORY = "memory"
+LIMIT_OUTPUT = "output"
+
+# Messages a process typically prints when an allocation fails under RLIMIT_AS.
+_MEMORY_ERROR_MARKERS = ("MemoryError", "Cannot allocate memory", "out of memory", "std::bad_alloc")
+
+class ResourceLimits:
+    """
+    Per-task limits. A limit of None is not enforced.
+    """
+    __slots__ = ("timeout_s", "cpu_seconds", "memory_bytes", "output_bytes")
+
+    def __init__(self, timeout_s: float | None = DEFAULT_TASK_TIMEOUT, cpu_seconds: int | None = DEFAULT_CPU_SECONDS,
+                 memory_bytes: int | None = DEFAULT_MEMORY_BYTES, output_bytes: int | None = DEFAULT_OUTPUT_BYTES):
+        self.timeout_s = timeout_s
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.output_bytes = output_bytes
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResourceLimits":
+        """
+        Builds limits from the `task_limits` section of a goal budget file.
+        Missing keys keep their defaults, null disables a limit.
+        """
+        limits = cls()
+        if "timeout_s" in config:
+            limits.timeout_s = config["timeout_s"]
+        if "cpu_seconds" in config:
+            limits.cpu_seconds = config["cpu_seconds"]
+        if "memory_mb" in config:
+            limits.memory_bytes = config["memory_mb"] * 1024 ** 2 if config["memory_mb"] is not None else None
+        if "output_kb" in config:
+            limits.output_bytes = config["output_kb"] * 1024 if config["output_kb"] is not None else None
+        return limits
+
+    def shell_command(self, command: str) -> str:
+        """
+        Returns the command prefixed with the `ulimit` calls that apply the CPU-time and
+        address-space limits to its shell and everything started from it. If a limit
+        cannot be set, the shell exits with status 126 instead of running the command.
+        """
+        if resource is None:
+            return command
+        ulimits = []
+        if self.cpu_seconds is not None:
+            # The soft limit sends SIGXCPU, the hard limit one second later SIGKILL.
+            hard = _within_hard_limit(resource.RLIMIT_CPU, self.cpu_seconds + 1)
+            # Soft first: a hard limit below the current soft limit is rejected.
+            ulimits += [f"ulimit -S -t {min(self.cpu_seconds, hard)}", f"ulimit -H -t {hard}"]
+        if self.memory_bytes is not None:
+            ulimits.append(f"ulimit -v {_within_hard_limit(resource.RLIMIT_AS, self.memory_bytes) // 1024}")
+        if not ulimits:
+            return command
+        # On its own line, so the command is parsed exactly as if it ran unprefixed.
+        return " && ".join(ulimits) + " || exit 126\n" + command
+
+    def popen_options(self) -> dict:
+        """
+        Returns the subprocess options that start a command in its own process group.
+        """
+        if os.name == "nt":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+def _within_hard_limit(limit_id: int, value: int) -> int:
+    """
+    Caps a limit at this process's hard limit, which an unprivileged shell cannot raise.
+    """
+    hard = resource.getrlimit(limit_id)[1]
+    return value if hard == resource.RLIM_INFINITY else min(value, hard)
+
+DEFAULT_LIMITS = ResourceLimits()
+
+def kill_process_group(pid: int) -> None:
+    """
+    Kills a process started with ResourceLimits.popen_options and everything it spawned.
+    """
+    if os.name != "nt":
+        try:
+            os.killpg(pid, signal.SIGKILL) # The session leader's pid is the group id
+        except (ProcessLookupError, PermissionError):
+            pass
+        return
+    try:
+        parent = psutil.Process(pid)
+        processes = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return
+    for process in processes:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+def _children_cpu_seconds() -> float | None:
+    """
+    CPU time used by the reaped child processes (and their reaped descendants) so far.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def _cpu_limit_hit(returncode: int | None, cpu_used: float | None, limits: ResourceLimits) -> bool:
+    """
+    Whether a command was stopped by RLIMIT_CPU.
+
+    A shell itself killed by SIGXCPU is unambiguous. When a command in the shell is killed,
+    the shell only exits with 128 + the signal, which a command can also exit with on its
+    own, so this (and SIGKILL from the hard limit) only counts if the command's process
+    tree used about as much CPU time as the limit allows.
+    """
+    if returncode is None or limits.cpu_seconds is None or not hasattr(signal, "SIGXCPU"):
+        return False
+    if returncode == -signal.SIGXCPU:
+        return True
+    if returncode not in (128 + signal.SIGXCPU, -signal.SIGKILL, 128 + signal.SIGKILL):
+        return False
+    return cpu_used is not None and cpu_used >= limits.cpu_seconds * 0.9
+
+def _limit_message(limit: str, limits: ResourceLimits) -> str:
+    if limit == LIMIT_WALL_TIME:
+        return f"wall-clock limit of {limits.timeout_s} s exceeded; process group killed."
+    if limit == LIMIT_CPU_TIME:
+        return f"CPU-time limit of {limits.cpu_seconds} s exceeded."
+    if limit == LIMIT_MEMORY:
+        return f"address-space limit of {limits.memory_bytes // 1024 ** 2} MiB likely exceeded (allocation failure)."
+    return f"output limit of {limits.output_bytes // 1024} KiB per stream exceeded; process group killed."
+
+def _finish(returncode: int | None, stdout: bytes, stderr: bytes, limit: str | None, limits: ResourceLimits, cpu_used: float | None) -> tuple[bool, str, str, str | None]:
+    """
+    Decodes the captured output, works out which limit (if any) stopped the command and
+    reports it at the end of stderr.
+    :param cpu_used: CPU seconds the command's process tree used, if known.
+    """
+    encoding = locale.getpreferredencoding(False)
+    stdout_text = stdout.decode(encoding, errors="replace")
+    stderr_text = stderr.decode(encoding, errors="replace")
+
+    if limit is None and returncode != 0:
+        if _cpu_limit_hit(returncode, cpu_used, limits):
+            limit = LIMIT_CPU_TIME
+        elif limits.memory_bytes is not None and any(marker in stderr_text for marker in _MEMORY_ERROR_MARKERS):
+            limit = LIMIT_MEMORY
+    if limit is not None:
+        stderr_text += f"\n[resource governor] Limit hit: {_limit_message(limit, limits)}"
+    return returncode == 0 and limit is None, stdout_text, stderr_text, limit
+
+def _start_governed(command: str, limits: ResourceLimits) -> subprocess.Popen:
+    return subprocess.Popen(limits.shell_command(command), shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **limits.popen_options())
+
+def _supervise(process: subprocess.Popen, limits: ResourceLimits, cpu_before: float | None) -> tuple[bool, str, str, str | None]:
+    """
+    Captures the output of a process started by _start_governed and enforces the limits
+    until the process exits or is killed.
+    """
+    output_exceeded = threading.Event()
+    buffers = {"stdout": bytearray(), "stderr": bytearray()}
+
+    def drain(stream, buffer: bytearray) -> None:
+        # Keeps reading past the cap (discarding) until the group is killed, so the
+        # command never blocks on a full pipe.
+        for chunk in iter(lambda: stream.read1(READ_CHUNK_BYTES), b""):
+            if limits.output_bytes is None or len(buffer) < limits.output_bytes:
+                buffer += chunk
+            if limits.output_bytes is not None and len(buffer) >= limits.output_bytes:
+                del buffer[limits.output_bytes:]
+                output_exceeded.set()
+        stream.close()
+
+    readers = [
+        threading.Thread(target=drain, args=(process.stdout, buffers["stdout"]), daemon=True),
+        threading.Thread(target=drain, args=(process.stderr, buffers["stderr"]), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    limit = None
+    deadline = time.monotonic() + limits.timeout_s if limits.timeout_s is not None else None
+    try:
+        # Waits for the shell to exit, not for the pipes to close.
+        while process.poll() is None:
+            if output_exceeded.is_set():
+                limit = LIMIT_OUTPUT
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                limit = LIMIT_WALL_TIME
+                break
+            output_exceeded.wait(0.05)
+    finally:
+        if limit is not None or process.poll() is None:
+            kill_process_group(process.pid)
+        process.wait()
+
+    # Background jobs of the command (e.g. `server &`) inherit the pipes and keep them
+    # open; they are left running, and their output after this point is not captured.
+    readers_deadline = time.monotonic() + 1
+    for reader in readers:
+        reader.join(timeout=max(0.0, readers_deadline - time.monotonic()))
+    cpu_used = _children_cpu_seconds() - cpu_before if cpu_before is not None else None
+    return _finish(process.returncode, bytes(buffers["stdout"]), bytes(buffers["stderr"]), limit, limits, cpu_used)
+
+def run_governed(command: str, limits: ResourceLimits = DEFAULT_LIMITS) -> tuple[bool, str, str, str | None]:
+    """
+    Runs a shell command under the given limits, blocking until it exits or is killed.
+
+    Returns:
+        A tuple of (success, stdout, stderr, limit hit or None).
+    """
+    # Child CPU time is process-wide; the agent runs one shell command at a time.
+    cpu_before = _children_cpu_seconds()
+    return _supervise(_start_governed(command, limits), limits, cpu_before)
+
+async def run_governed_async(command: str, limits: ResourceLimits = DEFAULT_LIMITS) -> tuple[bool, str, str, str | None]:
+    """
+    Runs a shell command under the given limits without blocking the event loop, by
+    supervising it exactly as run_governed does in a worker thread.
+    If the awaiting task is cancelled (e.g. by a step timeout), the process group is killed.
+
+    Returns:
+        The same (success, stdout, stderr, limit hit or None) tuple as run_governed.
+    """
+    cpu_before = _children_cpu_seconds()
+    process = _start_governed(command, limits)
+    try:
+        return await asyncio.to_thread(_supervise, process, limits, cpu_before)
+    except asyncio.CancelledError:
+        # The worker thread then sees the shell exit and finishes on its own.
+        kill_process_group(process.pid)
+        raise
+
+class RunBudget:
+    """
+    Step and wall-clock budget of a run. A bound of None is not enforced.
+    """
+
+    def __init__(self, max_steps: int | None = None, max_seconds: float | None = None, task_limits: ResourceLimits = DEFAULT_LIMITS):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.task_limits = task_limits
+        self.steps = 0
+        self._started = time.monotonic()
+
+    def start(self, steps: int = 0, elapsed_s: float = 0.0) -> None:
+        """
+        Starts (or, for a resumed run, continues) charging the budget.
+        """
+        self.steps = steps
+        self._started = time.monotonic() - elapsed_s
+
+    def charge_step(self) -> None:
+        self.steps += 1
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self._started
+
+    def remaining_s(self) -> float | None:
+        return max(0.0, self.max_seconds - self.elapsed_s) if self.max_seconds is not None else None
+
+    def exhausted(self) -> str | None:
+        """
+        Returns a description of the exhausted bound, or None while budget is left.
+        """
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            return f"step budget of {self.max_steps} steps used up"
+        if self.max_seconds is not None and self.elapsed_s >= self.max_seconds:
+            return f"time budget of {self.max_seconds} s used up"
+        return None
+
+    def usage(self) -> dict:
+        return {
+            "steps": self.steps,
+            "max_steps": self.max_steps,
+            "elapsed_s": self.elapsed_s,
+            "max_seconds": self.max_seconds,
+        }
+
+    def format_usage(self) -> str:
+        steps = f"{self.steps}/{self.max_steps} steps ({self.steps / self.max_steps:.0%})" if self.max_steps else f"{self.steps} steps (unbounded)"
+        elapsed = self.elapsed_s
+        seconds = f"{elapsed:.1f}/{self.max_seconds} s ({elapsed / self.max_seconds:.0%})" if self.max_seconds else f"{elapsed:.1f} s (unbounded)"
+        return f"{steps}, {seconds}"
+
+def load_goal_budget(path: str) -> RunBudget:
+    """
+    Loads the budget of a goal from its JSON budget file.
+    Returns an unbounded budget with the default task limits if there is no such file.
+    """
+    if not os.path.exists(path):
+        return RunBudget()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return RunBudget(
+            max_steps=config.get("max_steps"),
+            max_seconds=config.get("max_seconds"),
+            task_limits=ResourceLimits.from_config(config.get("task_limits") or {})
+        )
+    except (IOError, ValueError, TypeError) as e:
+        print(f"ERROR: Could not read goal budget {path}: {e}. Using the default limits.")
+        return RunBudget()
@@ -0,0 +1,173 @@
+"""
+This module provides an opt-in result cache for idempotent (read-only) shell commands,
+so repeated probes such as `git status` or `python --version` do not spawn a process
+on every loop or goal.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import time
+
+# --- Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSETS_DIR = os.path.join(PROJECT_ROOT, 'assets')
+SHELL_CACHE_FILE = os.path.join(ASSETS_DIR, "SHELL_CACHE.json")
+
+DEFAULT_TTL = 300 # Seconds a cached result stays valid
+DEFAULT_MAX_ENTRIES = 256 # Least recently used entries are evicted beyond this
+
+class ShellResultCache:
+    """
+    LRU + TTL cache of successful shell command results, persisted to SHELL_CACHE.json
+    so it is shared across loops and goals.
+
+    Entries are keyed on the command text, the working directory, the values of the
+    selected environment variables and the mtime/size of the declared input paths, so a
+    change to any of them is a cache miss. Failed commands are never cached.
+    """
+
+    def __init__(self, allowlist: tuple = (), ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES, cache_file: str | None = SHELL_CACHE_FILE):
+        """
+        :param allowlist: Regex patterns; plain `shell:` commands fully matching one are cached.
+        :param ttl: Default time-to-live of an entry, in seconds.
+        :param max_entries: Maximum number of entries kept (LRU eviction).
+        :param cache_file: Where the cache is persisted, or None to keep it in memory only.
+        """
+        self.allowlist = [re.compile(pattern) for pattern in allowlist]
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_file = cache_file
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Loads persisted entries, dropping the ones that have already expired.
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (IOError, ValueError) as e:
+            print(f"WARNING: Could not load shell result cache: {e}")
+            return
+        now = time.time()
+        for key, entry in entries.items():
+            if entry["expires_at"] > now:
+                self._entries[key] = entry
+        self._evict()
+
+    def _save(self) -> None:
+        """
+        Atomically persists the cache.
+        """
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.cache_file)
+        except IOError as e:
+            print(f"WARNING: Could not save shell result cache: {e}")
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_allowlisted(self, command: str) -> bool:
+        """
+        Checks whether a plain `shell:` command matches the allowlist.
+        """
+        return any(pattern.fullmatch(command) for pattern in self.allowlist)
+
+    @staticmethod
+    def make_key(command: str, cwd: str, env_vars: list = (), inputs: list = ()) -> str:
+        """
+        Builds the cache key of a command invocation.
+        :param command: The shell command text.
+        :param cwd: The working directory the command runs in.
+        :param env_vars: Names of environment variables whose values affect the result.
+        :param inputs: Paths the command reads; their mtime and size are fingerprinted.
+        :return: A hex digest identifying the invocation.
+        """
+        fingerprints = []
+        for path in inputs:
+            full_path = os.path.join(cwd, path)
+            try:
+                stat = os.stat(full_path)
+                fingerprints.append([path, stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                fingerprints.append([path, None, None])
+        material = json.dumps({
+            "command": command,
+            "cwd": cwd,
+            "env": [[name, os.environ.get(name)] for name in sorted(env_vars)],
+            "inputs": fingerprints,
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, str, str] | None:
+        """
+        Returns the cached (success, stdout, stderr) for a key, or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry["expires_at"] <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry["stdout"], entry["stderr"]
+
+    def put(self, key: str, command: str, stdout: str, stderr: str, ttl: float | None = None) -> None:
+        """
+        Stores the result of a successful command.
+        """
+        now = time.time()
+        self._entries[key] = {
+            "command": command,
+            "stdout": stdout,
+            "stderr": stderr,
+            "created_at": now,
+            "expires_at": now + (self.ttl if ttl is None else ttl),
+        }
+        self._entries.move_to_end(key)
+        self._evict()
+        self._save()
+
+    def _lookup(self, command: str, env_vars: list, inputs: list) -> tuple[str, tuple[bool, str, str] | None]:
+        """
+        Returns the key of a command invocation in the current directory and its cached result, if any.
+        """
+        key = self.make_key(command, os.getcwd(), env_vars, inputs)
+        return key, self.get(key)
+
+    async def run_async(self, command: str, executor, env_vars: list = (), inputs: list = (), ttl: float | None = None) -> tuple[bool, str, str, bool]:
+        """
+        Returns the cached result of a command, or runs it through the executor and caches it.
+        :param command: The shell command to execute.
+        :param executor: Coroutine function taking the command and returning (success, stdout, stderr),
+                         such as execute_shell_command_async.
+        :param env_vars: Names of environment variables that are part of the key.
+        :param inputs: Input paths that are part of the key.
+        :param ttl: Time-to-live of a new entry, defaults to the cache's ttl.
+        :return: A tuple of (success, stdout, stderr, cache_hit).
+        """
+        key, cached = self._lookup(command, env_vars, inputs)
+        if cached is not None:
+            return (*cached, True)
+        success, stdout, stderr = await executor(command)
+        if success:
+            self.put(key, command, stdout, stderr, ttl)
+        return success, stdout, stderr, False
@@ -0,0 +1,270 @@
+"""
+Deterministic simulation harness for benchmarking the agent loop itself.
+
+The shell executor, GUIController and AsyncWebController are swapped for scripted
+fakes with configurable latency and failure distributions, pacing and checkpoints are
+turned off, and the knowledge base is pointed at a scratch directory. The report
+separates the loop's own per-phase costs (observe, decide, act, record) from the
+simulated I/O time, so framework overhead can be tracked on its own. The phases only
+count time the loop waits for; the record writes that run in the background, overlapped
+with later steps, are reported on their own line.
+
+Usage:
+    python -m src.simulation [--episodes N] [--latency-ms MS] [--failure-rate P] [--seed S] [--goal GOAL]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from src import knowledge_manager
+from src.knowledge_manager import DURABILITY_NONE, configure_knowledge_writer, discard_working_memory, set_assets_dir
+from src.main import MAX_LOOPS, run_goal_async
+
+DEFAULT_GOAL = "Search Google for large language models"
+DEFAULT_EPISODES = 500
+PHASES = ("observe", "decide", "act", "record")
+
+class FakeOutcomes:
+    """
+    Draws the latency and success of fake actions from a seeded random generator.
+    A script of success flags, if given, is followed before falling back to failure_rate.
+    """
+
+    def __init__(self, rng: random.Random, latency_ms: float = 0.0, failure_rate: float = 0.0, script: list[bool] | None = None):
+        """
+        :param rng: Seeded random generator, shared by all fakes of a simulation.
+        :param latency_ms: Mean of the exponentially distributed action latency (0 for none).
+        :param failure_rate: Probability that an action fails.
+        :param script: Success flags of the first actions, in order.
+        """
+        self.rng = rng
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.script = list(script or [])
+        self.simulated_seconds = 0.0
+        self.actions = 0
+
+    def draw(self) -> tuple[float, bool]:
+        """
+        Returns the latency (in seconds) and success of the next action.
+        """
+        self.actions += 1
+        success = self.script.pop(0) if self.script else self.rng.random() >= self.failure_rate
+        latency = self.rng.expovariate(1000.0 / self.latency_ms) if self.latency_ms > 0 else 0.0
+        self.simulated_seconds += latency
+        return latency, success
+
+class FakeShell:
+    """
+    Stand-in for execute_shell_command_async.
+    """
+
+    def __init__(self, outcomes: FakeOutcomes):
+        self.outcomes = outcomes
+
+    async def __call__(self, command: str) -> tuple[bool, str, str]:
+        latency, success = self.outcomes.draw()
+        if latency:
+            await asyncio.sleep(latency)
+        return (True, f"simulated output of {command}\n", "") if success else (False, "", f"simulated failure of {command}")
+
+class FakeGUIController:
+    """
+    Stand-in for GUIController. Actions are blocking, like the real pywinauto calls.
+    """
+
+    def __init__(self, outcomes: FakeOutcomes):
+        self.outcomes = outcomes
+        self.current_app = None
+
+    async def run_async(self, action, *args):
+        # No COM here, so any worker thread will do.
+        return await asyncio.to_thread(action, *args)
+
+    def _act(self) -> bool:
+        latency, success = self.outcomes.draw()
+        if latency:
+            time.sleep(latency)
+        return success
+
+    def start_application(self, path: str = None, title_re: str = None, aumid: str = None, timeout: int = 20) -> bool:
+        success = self._act()
+        self.current_app = (path or aumid) if success else None
+        return success
+
+    def close_current_application(self) -> bool:
+        self.current_app = None
+        return self._act()
+
+    def close_application_by_name(self, app_exe_name: str) -> bool:
+        return self._act()
+
+    def click_element(self, control_identifiers: dict) -> bool:
+        return self._act()
+
+    def type_text_in_element(self, control_identifiers: dict, text: str) -> bool:
+        return self._act()
+
+    def send_keys_to_app(self, keys: str) -> bool:
+        return self._act()
+
+    def print_app_control_identifiers(self) -> None:
+        self._act()
+
+    def export_state(self) -> dict | None:
+        return {"process": self.current_app} if self.current_app else None
+
+    def restore_state(self, state: dict, timeout: int = 5) -> bool:
+        self.current_app = state.get("process")
+        return True
+
+class FakeWebController:
+    """
+    Stand-in for AsyncWebController.
+    """
+
+    def __init__(self, outcomes: FakeOutcomes):
+        self.outcomes = outcomes
+        self.browser = None
+        self.page = None
+        self.url = "about:blank"
+
+    async def _act(self) -> bool:
+        latency, success = self.outcomes.draw()
+        if latency:
+            await asyncio.sleep(latency)
+        return success
+
+    async def launch_browser(self, browser_type: str = "chromium", headless: bool = True, storage_state: dict | None = None) -> bool:
+        success = await self._act()
+        if success:
+            self.browser = self.page = browser_type
+        return success
+
+    async def navigate(self, url: str) -> bool:
+        success = await self._act()
+        if success:
+            self.url = url
+        return success
+
+    async def type_text_web(self, selector: str, text: str) -> bool:
+        return await self._act()
+
+    async def click_element_web(self, selector: str) -> bool:
+        return await self._act()
+
+    async def get_text_content(self, selector: str) -> str | None:
+        return "simulated text" if await self._act() else None
+
+    async def wait_for_selector(self, selector: str, state: str = "visible", timeout: int = 30000) -> bool:
+        return await self._act()
+
+    async def close_browser(self) -> bool:
+        self.browser = self.page = None
+        return True
+
+    async def export_state(self) -> dict | None:
+        return {"browser_type": self.browser, "url": self.url} if self.page else None
+
+    async def restore_state(self, state: dict) -> bool:
+        self.browser = self.page = state.get("browser_type")
+        self.url = state.get("url", "about:blank")
+        return True
+
+async def _simulate(goal: str, episodes: int, outcomes: FakeOutcomes) -> dict:
+    shell = FakeShell(outcomes)
+    gui_controller = FakeGUIController(outcomes)
+    web_controller = FakeWebController(outcomes)
+    phase_times = {}
+    iterations = 0
+    reset_seconds = 0.0
+
+    started = time.perf_counter()
+    for _ in range(episodes):
+        iterations += await run_goal_async(
+            goal,
+            gui_controller,
+            web_controller,
+            shell_executor=shell,
+            max_loops=MAX_LOOPS,
+            step_pause=0,
+            checkpoints=False,
+            phase_times=phase_times
+        )
+        reset_started = time.perf_counter()
+        await web_controller.close_browser()
+        discard_working_memory()
+        reset_seconds += time.perf_counter() - reset_started
+    wall_seconds = time.perf_counter() - started
+
+    return {
+        "episodes": episodes,
+        "iterations": iterations,
+        "actions": outcomes.actions,
+        "wall_s": wall_seconds,
+        "iterations_per_s": iterations / wall_seconds if wall_seconds else 0.0,
+        "phase_s": {phase: phase_times.get(phase, 0.0) for phase in PHASES},
+        "record_background_s": phase_times.get("record_background", 0.0),
+        "reset_s": reset_seconds,
+        "simulated_io_s": outcomes.simulated_seconds,
+        "overhead_s": wall_seconds - outcomes.simulated_seconds - reset_seconds,
+    }
+
+def run_simulation(goal: str = DEFAULT_GOAL, episodes: int = DEFAULT_EPISODES, latency_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 0, script: list[bool] | None = None) -> dict:
+    """
+    Runs the agent loop for a number of episodes of a goal against the fakes, on a
+    scratch knowledge base, and returns the throughput and per-phase cost report.
+    The real knowledge base is left untouched.
+    """
+    outcomes = FakeOutcomes(random.Random(seed), latency_ms=latency_ms, failure_rate=failure_rate, script=script)
+    original_assets_dir = knowledge_manager.ASSETS_DIR
+    with tempfile.TemporaryDirectory(prefix="gear-sim-") as scratch_dir:
+        set_assets_dir(scratch_dir)
+        configure_knowledge_writer(durability=DURABILITY_NONE)
+        try:
+            # The loop's console output is part of its cost, but not of the report.
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                report = asyncio.run(_simulate(goal, episodes, outcomes))
+        finally:
+            configure_knowledge_writer()
+            set_assets_dir(original_assets_dir)
+    return report
+
+def format_report(report: dict) -> str:
+    """
+    Renders a simulation report as plain text.
+    """
+    iterations = report["iterations"] or 1
+    lines = [
+        f"Episodes: {report['episodes']}  iterations: {report['iterations']}  actions: {report['actions']}",
+        f"Wall time: {report['wall_s']:.3f} s  ({report['iterations_per_s']:.0f} iterations/s)",
+        f"Simulated I/O: {report['simulated_io_s']:.3f} s  loop overhead: {report['overhead_s']:.3f} s "
+        f"({report['overhead_s'] / iterations * 1e6:.0f} us/iteration)",
+        "",
+        "Per-phase cost (including simulated I/O in act):",
+    ]
+    for phase, seconds in report["phase_s"].items():
+        lines.append(f"  {phase:<8} {seconds:8.3f} s  {seconds / iterations * 1e6:8.0f} us/iteration")
+    lines.append(f"  {'reset':<8} {report['reset_s']:8.3f} s  (between episodes)")
+    lines.append(f"Record writes in the background: {report['record_background_s']:.3f} s (overlapped with the phases above)")
+    return "\n".join(lines)
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the G.E.A.R. loop against simulated controllers.")
+    parser.add_argument("--goal", default=DEFAULT_GOAL, help="Goal to run in every episode.")
+    parser.add_argument("--episodes", type=int, default=DEFAULT_EPISODES, help="Number of episodes to simulate.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean simulated latency of every action.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a simulated action fails.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the simulated outcomes.")
+    args = parser.parse_args(argv)
+
+    report = run_simulation(args.goal, args.episodes, args.latency_ms, args.failure_rate, args.seed)
+    print(format_report(report))
+
+if __name__ == "__main__":
+    main()
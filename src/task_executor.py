@@ -1,31 +1,46 @@
 """
 This module is responsible for executing shell commands.
+
+Commands run under the per-task limits of src.resource_governor (wall-clock timeout,
+CPU time, address space, captured output), in their own process group.
 """
 
-import subprocess
+from src.resource_governor import DEFAULT_LIMITS, ResourceLimits, run_governed, run_governed_async
 
-def execute_shell_command(command: str) -> tuple[bool, str, str]:
+def execute_shell_command(command: str, limits: ResourceLimits = DEFAULT_LIMITS) -> tuple[bool, str, str]:
     """
     Executes a shell command and captures its output.
 
     Args:
         command: The shell command to execute.
+        limits: The resource limits the command runs under.
 
     Returns:
         A tuple containing:
-        - bool: True if the command was successful (exit code 0), False otherwise.
+        - bool: True if the command was successful (exit code 0) within its limits, False otherwise.
         - str: The standard output of the command.
-        - str: The standard error of the command.
+        - str: The standard error of the command, ending with the limit that was hit, if any.
+    """
+    try:
+        success, stdout, stderr, _ = run_governed(command, limits)
+        return success, stdout, stderr
+    except Exception as e:
+        return False, "", str(e)
+
+async def execute_shell_command_async(command: str, limits: ResourceLimits = DEFAULT_LIMITS) -> tuple[bool, str, str]:
+    """
+    Executes a shell command without blocking the event loop and captures its output.
+    If the awaiting task is cancelled (e.g. by a step timeout), the process group is killed.
+
+    Args:
+        command: The shell command to execute.
+        limits: The resource limits the command runs under.
+
+    Returns:
+        The same (success, stdout, stderr) tuple as execute_shell_command.
     """
     try:
-        process = subprocess.run(
-            command, 
-            shell=True, 
-            check=False, 
-            capture_output=True, 
-            text=True
-        )
-        success = process.returncode == 0
-        return success, process.stdout, process.stderr
+        success, stdout, stderr, _ = await run_governed_async(command, limits)
+        return success, stdout, stderr
     except Exception as e:
         return False, "", str(e)